@@ -1,27 +1,38 @@
-from src.neo4j_connection import Neo4JConnectionDiplomatico, QueryType
+from src.query_type import QueryType
 from src.diplomatico.board import Board
 
 import argparse
-from tqdm import tqdm
-from typing import Optional, Tuple, Dict
-from scipy import stats
-import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
+import asyncio
+import os
+from typing import Optional, Tuple, Dict, List, TYPE_CHECKING
+
+# the database driver, SciPy and the plotting stack are imported where needed, to keep startup fast
+if TYPE_CHECKING:
+    from src.neo4j_connection import Neo4JConnectionDiplomatico
 
 centralities = ["betweenness", "closeness", "degree", "eigenvector"]
 
-def _heatmap(data: Dict[Tuple[int, int], float], title: str = "Heatmap") -> None:
+def _heatmap(data: Dict[Tuple[int, int], float], title: str = "Heatmap", save_dir: Optional[str] = None) -> None:
     """
-        Generate a heatmap.
+        Generate a heatmap; it is shown in a window, or saved as '<title>.png' when a directory is given
+        or no interactive backend is available.
 
         :param data: For each key (position in the grid), contains the value to plot.
+        :param title: The title of the heatmap.
+        :param save_dir: Optional directory to save the heatmap to, instead of showing it.
     """
     # Determine grid size from data keys
     if not data:
         print("No data provided for heatmap.")
         return
 
+    import matplotlib
+    if save_dir is not None:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+
     rows = max(k[0] for k in data.keys()) + 1
     cols = max(k[1] for k in data.keys()) + 1
 
@@ -46,31 +57,83 @@ def _heatmap(data: Dict[Tuple[int, int], float], title: str = "Heatmap") -> None
     ax.set_yticklabels([str(y) for y in range(rows)])
 
     plt.tight_layout()
-    plt.show()
-
-def plot_heatmap(r: int, c: int, centrality: str) -> None:
-    conn = Neo4JConnectionDiplomatico()
+    if save_dir is None and matplotlib.get_backend().lower() != "agg":
+        plt.show()
+    else:
+        path = os.path.join(save_dir or ".", f"{title}.png")
+        fig.savefig(path)
+        print(f"Heatmap saved to {path}")
+    plt.close(fig)
 
-    conn.clean_graph()
-    conn.create_graph_query(r=r, c=c)
-    conn.node_centrality(0, 0, centralities=[centrality])
+def plot_heatmap(conn: "Neo4JConnectionDiplomatico", centrality: str, save_dir: Optional[str] = None) -> None:
+    conn.write_centralities([centrality])
 
+    board = conn.board_graph.board
     data = {}
-    for i in range(r):
-        for j in range(c):
+    for i in range(board.r):
+        for j in range(board.c):
             data[(i, j)] = conn.get_property_indices(row=i, col=j, property=centrality)
-    _heatmap(data, title=centrality)
+    _heatmap(data, title=centrality, save_dir=save_dir)
+
+
+def plot_path_statistics(conn: "Neo4JConnectionDiplomatico", steps: Optional[List[int]] = None,
+                         query_type: QueryType = QueryType.APOC, save_dir: Optional[str] = None) -> None:
+    """
+        Aggregate the per-cell statistics of all the Hamiltonian paths as they are streamed, without storing them,
+        and plot how often each cell starts and ends a path, its average step, and its visits at the given steps.
+
+        :param conn: The connection to the board graph.
+        :param steps: Optional step numbers, from 1 to r * c, to plot the visits of.
+        :param query_type: The type of algorithm enumerating the paths.
+        :param save_dir: Optional directory to save the heatmaps to, instead of showing them.
+    """
+    from src.diplomatico.statistics import PathStatistics
+
+    board = conn.board_graph.board
+    stats = PathStatistics(board.r, board.c)
+    conn.hamiltonian_paths(query_type=query_type, n=None, on_path=stats)
+    print(f"Aggregated {stats.total} Hamiltonian paths")
+    if not stats.total:
+        return
 
+    _heatmap(stats.grid(stats.starts), title="path starts", save_dir=save_dir)
+    _heatmap(stats.grid(stats.ends), title="path ends", save_dir=save_dir)
+    _heatmap(stats.grid(stats.mean_step()), title="mean step", save_dir=save_dir)
+    for k in steps or []:
+        _heatmap(stats.grid(stats.step(k)), title=f"step {k}", save_dir=save_dir)
 
-def main(r: int, c: int, node: Optional[Tuple[int, int]] = None, all: bool = False):
+
+async def _analyze_nodes(conn: "Neo4JConnectionDiplomatico", to_iterate: List[Tuple[int, int]], concurrency: int,
+                         query_type: QueryType = QueryType.APOC) -> Tuple[Dict[Tuple[int, int], Dict], List[List[int]]]:
+    """
+        Read the centralities and count the Hamiltonian paths of the given nodes, with many queries in flight at once.
+
+        :return: The centralities by node, and the start-by-end path count matrix of the given start nodes.
+    """
+    from src.neo4j_async import AsyncNeo4JConnectionDiplomatico, gather_bounded
+
+    async with AsyncNeo4JConnectionDiplomatico(conn.board_graph, max_concurrency=concurrency) as aconn:
+        results = await gather_bounded(
+            [aconn.node_centrality(node[0], node[1], centralities=centralities) for node in to_iterate],
+            limit=concurrency, progress="Analyzing nodes"
+        )
+        # a single search per start cell counts its paths towards every end cell at once
+        matrix = await aconn.path_count_matrix(query_type=query_type, starting_nodes=to_iterate, progress="Counting paths")
+
+    return dict(zip(to_iterate, results)), matrix
+
+
+def main(r: int, c: int, node: Optional[Tuple[int, int]] = None, all: bool = False, concurrency: int = 8,
+         heat: bool = False, save_dir: Optional[str] = None, stats: bool = False, steps: Optional[List[int]] = None,
+         query_type: QueryType = QueryType.APOC):
+    from src.neo4j_connection import Neo4JConnectionDiplomatico
     conn = Neo4JConnectionDiplomatico()
 
-    conn.clean_graph()
     conn.create_graph_query(r=r, c=c)
 
     if node:
         result = conn.hamiltonian_paths(
-            query_type=QueryType.APOC,
+            query_type=query_type,
             starting_node=node,
             n=1
         )
@@ -82,24 +145,25 @@ def main(r: int, c: int, node: Optional[Tuple[int, int]] = None, all: bool = Fal
             print(f"{key.capitalize()} centrality: {result[key]:.4f}")
 
     else:
-        nodes: Dict[Tuple[int, int], Dict] = {}
-        paths: Dict[Tuple[int, int], int] = {}
         to_iterate = conn.board_graph.board.get_unique_nodes() if not all else [(i, j) for i in range(r) for j in range(c)]
-        for node in tqdm(to_iterate, desc="Analyzing nodes"):
-            i, j = node
-            nodes[(i, j)] = conn.node_centrality(i, j, centralities=centralities)
-            paths[(i, j)] = len(conn.hamiltonian_paths(
-                query_type=QueryType.APOC,
-                starting_node=(i, j),
-                n=None
-            ))
+        conn.write_centralities(centralities)
+        nodes, matrix = asyncio.run(_analyze_nodes(conn, to_iterate, concurrency, query_type=query_type))
+        paths = {key: sum(matrix[key[0] * c + key[1]]) for key in nodes}
+        from scipy.stats import pearsonr
         for centrality in centralities:
             x = [nodes[key][centrality] for key in nodes]
-            y = [paths[key] for key in paths]
+            y = [paths[key] for key in nodes]
             print(f"\nCorrelation between {centrality} centrality and number of Hamiltonian paths:")
-            correlation = stats.pearsonr(x, y)
+            correlation = pearsonr(x, y)
             print(f"Pearson Correlation: {correlation.statistic:.4f}, p-value: {correlation.pvalue:.4f}") # type: ignore
 
+    if heat:
+        for centrality in centralities:
+            plot_heatmap(conn, centrality, save_dir=save_dir)
+
+    if stats:
+        plot_path_statistics(conn, steps=steps, query_type=query_type, save_dir=save_dir)
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Centrality analysis script.")
@@ -107,7 +171,12 @@ if __name__ == '__main__':
     parser.add_argument('--c', type=int, required=False, default=5, help='Number of columns')
     parser.add_argument('--node', type=str, required=False, help="Node in format 'row,col'")
     parser.add_argument('--all', action='store_true', help="Analyze all nodes")
-    parser.add_argument('--heat', action='store_true', help="Generate heatmap")
+    parser.add_argument('--heat', action='store_true', help="Generate heatmaps")
+    parser.add_argument('--save', type=str, required=False, default=None, help="Directory to save heatmaps to instead of showing them")
+    parser.add_argument('--stats', action='store_true', help="Generate heatmaps of the per-cell statistics of all the Hamiltonian paths")
+    parser.add_argument('--steps', type=str, required=False, default=None, help="Step numbers to plot the visits of with --stats, as 'k1,k2,...'")
+    parser.add_argument('--query_type', type=QueryType.from_str, required=False, default=QueryType.APOC, help="Type of query enumerating the paths: APOC (default) or PYTHON")
+    parser.add_argument('--concurrency', type=int, required=False, default=8, help="Maximum number of queries in flight at once")
     args = parser.parse_args()
 
     def parse_node(value: Optional[str]) -> Optional[Tuple[int, int]]:
@@ -119,7 +188,6 @@ if __name__ == '__main__':
         except ValueError:
             raise argparse.ArgumentTypeError("Starting node must be in the format 'row,col' with integers.")
 
-    if True:
-        plot_heatmap(args.r, args.c, "betweenness")    
-    
-    main(args.r, args.c, parse_node(args.node), args.all)
\ No newline at end of file
+    steps = [int(k) for k in args.steps.split(",")] if args.steps else None
+    main(args.r, args.c, parse_node(args.node), args.all, args.concurrency, heat=args.heat, save_dir=args.save,
+         stats=args.stats, steps=steps, query_type=args.query_type)
\ No newline at end of file
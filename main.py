@@ -1,34 +1,109 @@
 import argparse
-from typing import Optional, Tuple
+import sys
+import time
+from typing import Optional, Tuple, List
 
 from src.diplomatico.board import Board
-from src.neo4j_connection import Neo4JConnectionDiplomatico, QueryType
+from src.diplomatico.feasibility import FeasibilityChecker
+from src.diplomatico.moves import MoveRule, DIPLOMATICO
+from src.query_type import QueryType
+from src.solver import Solver
 
 def main(r: int, c: int, n: Optional[int], query_type: str,
          t: Optional[int] = None, 
          starting_node: Optional[Tuple[int, int]] = None, 
          ending_node: Optional[Tuple[int, int]] = None,
-         warnsdorf: bool = True):
+         warnsdorf: bool = True,
+         cycles: bool = False,
+         rule: MoveRule = DIPLOMATICO,
+         export: bool = False,
+         batch_size: int = 1000,
+         count: bool = False,
+         k: int = 0,
+         distinct: bool = False):
     
-    conn = Neo4JConnectionDiplomatico()
+    strategy = QueryType.from_str(query_type)
+    if count and strategy != QueryType.PYTHON:
+        raise ValueError("Counting is only supported by the PYTHON query type.")
+    # unless exporting, the in-process solvers need neither the database nor its driver
+    in_process = strategy in (QueryType.PYTHON, QueryType.JIT)
+    if not in_process or export:
+        from src.neo4j_connection import Neo4JConnectionDiplomatico
+        conn = Neo4JConnectionDiplomatico()
 
-    conn.clean_graph()
-    conn.create_graph_query(r=r, c=c)
+        # boards are scoped by identifier: an already stored board is reused, others are left untouched
+        conn.create_graph_query(r=r, c=c, rule=rule)
+
+    if in_process:
+        board = Board(r, c, rule=rule)
+        if strategy == QueryType.JIT:
+            from src.jit_solver import JitSolver
+            solver_class = JitSolver
+        else:
+            solver_class = Solver
+
+        def find_paths(progress: bool = False, warnsdorf: bool = True, on_path=None) -> List:
+            return solver_class(board, warnsdorf=warnsdorf).solve(
+                starting_point=starting_node,
+                ending_point=ending_node,
+                n=n,
+                progress=progress,
+                on_path=on_path
+            )
+
+        def find_cycles() -> List:
+            return Solver(board, warnsdorf=warnsdorf).solve_cycles(n=n, progress=t is not None)
+    else:
+        def find_paths(progress: bool = False, warnsdorf: bool = True, on_path=None) -> List:
+            return conn.hamiltonian_paths(
+                query_type=strategy, 
+                n=n, 
+                starting_node=starting_node,
+                ending_node=ending_node,
+                progress=progress,
+                warnsdorf=warnsdorf,
+                on_path=on_path
+            )
+
+        def find_cycles() -> List:
+            return conn.hamiltonian_cycles(query_type=strategy, n=n)
+
+    if cycles:
+        result = find_cycles()
+        print(f"Hamiltonian cycles on the {r}x{c} board: {len(result)}")
+        print(f"Open paths derived by rotation: {2 * len(result) * r * c}")
+        return
+
+    if distinct:
+        from src.diplomatico.symmetry import SolutionDeduplicator
+        deduplicator = SolutionDeduplicator(Board(r, c, rule=rule))
+        start_time = time.time()
+        find_paths(warnsdorf=warnsdorf, on_path=deduplicator)
+        elapsed = time.time() - start_time
+        print(f"Hamiltonian paths on the {r}x{c} board: {deduplicator.total}")
+        print(f"Distinct up to symmetry and reversal: {len(deduplicator)} "
+              f"({len(deduplicator.canonicalizer.symmetries)} symmetries, {elapsed:.4f}s)")
+        return
+
+    if count:
+        solver = Solver(board)
+        times = []
+        total = 0
+        for _ in range(t or 1):
+            start_time = time.time()
+            total = solver.count(starting_point=starting_node, ending_point=ending_node, k=k)
+            times.append(time.time() - start_time)
+        avg_time = sum(times) / len(times)
+        print(f"Hamiltonian paths on the {r}x{c} board: {total}")
+        print(f"Average time over {len(times)} runs with k = {k}: {avg_time:.4f}s ({total / max(avg_time, 1e-9):.0f} paths/s)")
+        return
 
     if t:
         times = []
         result = []
         for _ in range(t):
-            import time
             start_time = time.time()
-            result = conn.hamiltonian_paths(
-                query_type=QueryType.from_str(query_type), 
-                n=n, 
-                starting_node=starting_node,
-                ending_node=ending_node,
-                progress=True,
-                warnsdorf=warnsdorf
-            )
+            result = find_paths(progress=True, warnsdorf=warnsdorf)
             end_time = time.time()
             times.append(end_time - start_time)
         avg_time = sum(times) / t
@@ -36,22 +111,118 @@ def main(r: int, c: int, n: Optional[int], query_type: str,
         print(f"Solutions found: {len(result)}")
 
     else:
-        result = conn.hamiltonian_paths(
-            query_type=QueryType.from_str(query_type), 
-            n=n, 
-            starting_node=starting_node,
-            ending_node=ending_node
-        )
+        result = find_paths()
         for i in range(len(result)):
             print(f"Path {i + 1}:")
             Board.print_board(result[i])
 
+    if not result:
+        reason = FeasibilityChecker.from_board(Board(r, c, rule=rule)).check(starting_node, ending_node)
+        if reason:
+            print(f"No Hamiltonian path can exist: {reason}.")
+
+    if export:
+        start_time = time.time()
+        # solutions already exported by an earlier run are matched, not written twice
+        exported = conn.export_solutions(result, batch_size=batch_size)
+        elapsed = time.time() - start_time
+        print(f"Exported {exported} solutions in {elapsed:.4f}s ({exported / max(elapsed, 1e-9):.0f} solutions/s)")
+
+
+def solve_puzzle(path: str, n: Optional[int], warnsdorf: bool = True, rule: MoveRule = DIPLOMATICO):
+    r, c, clues = Board.read_puzzle(path)
+    solver = Solver(Board(r, c, rule=rule), warnsdorf=warnsdorf)
+    result = solver.solve_puzzle(clues, n=n)
+    if not result:
+        print("The puzzle has no solution.")
+    for i in range(len(result)):
+        print(f"Path {i + 1}:")
+        Board.print_board(result[i])
+
+def count_widths(r: int, max_c: int, rule: MoveRule = DIPLOMATICO):
+    from src.transfer_matrix import TransferMatrixCounter
+    start_time = time.time()
+    counts = TransferMatrixCounter(r, rule=rule).count(max_c)
+    for c, count in enumerate(counts, start=1):
+        print(f"{r}x{c}: {count}")
+    print(f"Counted {max_c} widths in {time.time() - start_time:.4f}s")
+
+def sample_paths(r: int, c: int, n: int, seed: Optional[int] = None, thin: Optional[int] = None,
+                 output: Optional[str] = None, rule: MoveRule = DIPLOMATICO):
+    from src.sampler import BackbiteSampler
+    start_time = time.time()
+    sampler = BackbiteSampler(Board(r, c, rule=rule), seed=seed)
+    setup_time = time.time() - start_time
+
+    start_time = time.time()
+    out = open(output, "w") if output else sys.stdout
+    try:
+        # one path per line, as the cell indices (row * c + col) in order
+        for path in sampler.sample(n, thin=thin):
+            out.write(" ".join(map(str, path)) + "\n")
+    finally:
+        if output:
+            out.close()
+    elapsed = time.time() - start_time
+    print(f"Initial path found in {setup_time:.4f}s")
+    print(f"Sampled {n} paths in {elapsed:.4f}s ({n / max(elapsed, 1e-9):.0f} samples/s, acceptance rate {sampler.acceptance_rate():.2f})")
+
+def estimate_search(r: int, c: int, starting_node: Optional[Tuple[int, int]] = None, ending_node: Optional[Tuple[int, int]] = None,
+                    warnsdorf: bool = True, rule: MoveRule = DIPLOMATICO, probes: int = 1000, seed: Optional[int] = None):
+    from src.estimator import SearchTreeEstimator
+    board = Board(r, c, rule=rule)
+    for per_pair, method in [(True, "solve (PYTHON)"), (False, "count / one search per start")]:
+        start_time = time.time()
+        estimator = SearchTreeEstimator(board, warnsdorf=warnsdorf, seed=seed, per_pair=per_pair)
+        estimates = estimator.estimate(starting_point=starting_node, ending_point=ending_node, probes=probes)
+        print(f"{method} on the {r}x{c} board, estimated with {probes} probes in {time.time() - start_time:.4f}s:")
+        for name, estimate in estimates.items():
+            print(f"  {name}: {estimate}")
+    print("The intervals assume normally distributed means, which the heavy tails of the probe estimates make "
+          "unreliable: they can miss the true value, mostly for solutions with few hits. Rerun with more --probes "
+          "or another --seed to check them.")
+    if ending_node is None:
+        print("The Cypher query types search at least as many nodes as solve; prefer PYTHON --count for counts.")
+
+
+import unittest
+
+class TestStartup(unittest.TestCase):
+    # heavy dependencies must only load when the selected mode needs them
+    HEAVY_MODULES = ["py2neo", "neo4j", "tqdm", "numpy", "numba", "scipy", "seaborn", "matplotlib"]
+    BUDGET_SECONDS = 0.5
+
+    def _import(self, module: str):
+        import os
+        import subprocess
+        import sys
+        code = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "print(time.perf_counter() - start)\n"
+            f"print(','.join(m for m in {self.HEAVY_MODULES!r} if m in sys.modules))\n"
+        )
+        root = os.path.dirname(os.path.abspath(__file__))
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root).stdout.split("\n")
+        return float(output[0]), [m for m in output[1].split(",") if m]
+
+    def test_main_import(self):
+        elapsed, loaded = self._import("main")
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, self.BUDGET_SECONDS)
+
+    def test_centrality_import(self):
+        elapsed, loaded = self._import("centrality")
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, self.BUDGET_SECONDS)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Create Neo4J board graph.")
     parser.add_argument("--r", type=int, required=False, help="Number of rows", default=5)
     parser.add_argument("--c", type=int, required=False, help="Number of columns", default=5)
-    parser.add_argument("--query_type", type=str, required=False, help="Type of query: RAW, APOC, CONSTRUCTIVE, PYTHON", default="RAW")
+    parser.add_argument("--query_type", type=str, required=False, help="Type of query: RAW, APOC, CONSTRUCTIVE, INCREMENTAL, PYTHON, JIT", default="RAW")
     parser.add_argument("--n", type=int, required=False, help="Number of paths to return", default=None)
 
     def parse_node(value: Optional[str]) -> Optional[Tuple[int, int]]:
@@ -66,6 +237,33 @@ if __name__ == "__main__":
     parser.add_argument("--starting_node", type=parse_node, required=False, help="Starting node as 'row,col'", default=None)
     parser.add_argument("--ending_node", type=parse_node, required=False, help="Ending node as 'row,col'", default=None)
     parser.add_argument("--t", type=int, required=False, help="How many times to try and average the time", default=None)
-    parser.add_argument("--w", required=False, help="Use Warnsdorf's rule (only for PYTHON query type)")
+    parser.add_argument("--w", required=False, help="Use Warnsdorf's rule (only for PYTHON, JIT and INCREMENTAL query types)")
+    parser.add_argument("--cycles", action="store_true", help="Count the Hamiltonian cycles instead (only APOC and PYTHON query types)")
+    parser.add_argument("--rule", type=MoveRule.from_str, required=False, help="Move rule: diplomatico, knight, or a leaper as 'a,b'", default=DIPLOMATICO)
+    parser.add_argument("--puzzle", type=str, required=False, help="Complete the partially-filled board in the given file instead", default=None)
+    parser.add_argument("--export", action="store_true", help="Write the solutions into Neo4J as :Solution nodes")
+    parser.add_argument("--batch_size", type=int, required=False, help="Number of solutions written per transaction by --export", default=1000)
+    parser.add_argument("--count", action="store_true", help="Count the Hamiltonian paths without building them (only PYTHON query type)")
+    parser.add_argument("--k", type=int, required=False, help="Number of search levels --count expands breadth-first before searching depth-first", default=0)
+    parser.add_argument("--sample", type=int, required=False, help="Sample this many random Hamiltonian paths instead, with a backbite Markov chain", default=None)
+    parser.add_argument("--seed", type=int, required=False, help="Seed of the random generator of --sample and --estimate", default=None)
+    parser.add_argument("--thin", type=int, required=False, help="Number of chain moves between two samples (default: the board size)", default=None)
+    parser.add_argument("--output", type=str, required=False, help="File to stream the sampled paths to, instead of the standard output", default=None)
+    parser.add_argument("--distinct", action="store_true", help="Count the distinct solutions up to board symmetry and path reversal instead")
+    parser.add_argument("--estimate", action="store_true", help="Estimate the size and duration of the search with random probes instead")
+    parser.add_argument("--probes", type=int, required=False, help="Number of random probes of --estimate", default=1000)
+    parser.add_argument("--widths", action="store_true", help="Count the Hamiltonian paths of the r x c' boards for every c' up to --c instead")
+    parser.add_argument("--cache_dir", type=str, required=False, help="Directory to cache the compiled move tables in, across runs", default=None)
     args = parser.parse_args()
-    main(r=args.r, c=args.c, n=args.n, t=args.t, query_type=args.query_type, starting_node=args.starting_node, ending_node=args.ending_node, warnsdorf=bool(args.w))
\ No newline at end of file
+    MoveRule.cache_dir = args.cache_dir
+    if args.puzzle:
+        solve_puzzle(args.puzzle, n=args.n, warnsdorf=bool(args.w), rule=args.rule)
+    elif args.sample is not None:
+        sample_paths(args.r, args.c, args.sample, seed=args.seed, thin=args.thin, output=args.output, rule=args.rule)
+    elif args.estimate:
+        estimate_search(args.r, args.c, starting_node=args.starting_node, ending_node=args.ending_node, warnsdorf=bool(args.w),
+                        rule=args.rule, probes=args.probes, seed=args.seed)
+    elif args.widths:
+        count_widths(args.r, args.c, rule=args.rule)
+    else:
+        main(r=args.r, c=args.c, n=args.n, t=args.t, query_type=args.query_type, starting_node=args.starting_node, ending_node=args.ending_node, warnsdorf=bool(args.w), cycles=args.cycles, rule=args.rule, export=args.export, batch_size=args.batch_size, count=args.count, k=args.k, distinct=args.distinct)
\ No newline at end of file
@@ -1,19 +1,24 @@
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
+
+from src.diplomatico.moves import MoveRule, DIPLOMATICO
 
 class Board:
     """
         Class representing the game board.
     """
 
-    def __init__(self, r: int, c: int):
+    def __init__(self, r: int, c: int, rule: MoveRule = DIPLOMATICO):
         """
         Initialize the board with the given number of rows and columns.
 
             :param r: Number of rows
             :param c: Number of columns
+            :param rule: The move rule of the game
         """
         self.r: int = r
         self.c: int = c
+        self.rule: MoveRule = rule
+        self.table = rule.compile(r, c)
         self.board: List[List[int]] = [[0 for _ in range(c)] for _ in range(r)]
         self.step = 1
 
@@ -67,16 +72,10 @@ class Board:
 
         :return: A list of tuples representing the coordinates of possible moves
         """
-        moves: List[Tuple[int, int]] = []
-        directions = [
-            (2, 2), (-2, 2), (2, -2), (-2, -2),
-            (0, 3), (0, -3), (3, 0), (-3, 0)
-        ]
-        for dr, dc in directions:
-            new_row, new_col = i + dr, j + dc
-            if self.is_valid_cell(new_row, new_col) and self.board[new_row][new_col] == 0:
-                moves.append((new_row, new_col))
-        return moves
+        if not self.is_valid_cell(i, j):
+            return []
+        board = self.board
+        return [(row, col) for row, col in self.table.moves[i * self.c + j] if board[row][col] == 0]
     
     def clean(self) -> None:
         """
@@ -99,6 +98,24 @@ class Board:
         self.step += 1
         return True
 
+    def restore(self, cells: List[Tuple[int, int]], current: Tuple[int, int]) -> bool:
+        """
+        Resume a search from a state where only the visited cells and the last one matter, not their order.
+        The visited cells are numbered in the given order, and the current cell last.
+
+        :param cells: The visited cells other than the current one, as (row, col)
+        :param current: The cell the search continues from, as (row, col)
+        :return: True if the state was restored, False if a cell is invalid or repeated
+        """
+        self.clean()
+        for pos in list(cells) + [current]:
+            if not self.is_valid_cell(pos[0], pos[1]) or self.board[pos[0]][pos[1]] != 0:
+                self.clean()
+                return False
+            self.board[pos[0]][pos[1]] = self.step
+            self.step += 1
+        return True
+
     def move(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> bool:
         """
         Move to a new position on the board.
@@ -212,6 +229,39 @@ class Board:
             print("|" + " ".join(f"{cell:2}|" for cell in row))
             print("-" * (max_col * 4))
 
+    @classmethod
+    def read_puzzle(cls, path: str) -> Tuple[int, int, Dict[Tuple[int, int], int]]:
+        """
+        Read a partially-filled board from a text file.
+        Each line is a row of numbers separated by spaces or '|', with 0, '.' or '_' for empty cells;
+        blank lines and '-' separator lines are skipped, so the output of `print_board` can be read back.
+
+        :param path: The path of the puzzle file
+        :return: The number of rows, the number of columns and the fixed numbers as {(row, col): number}
+        """
+        rows: List[List[str]] = []
+        with open(path) as f:
+            for line in f:
+                tokens = line.replace("|", " ").split()
+                if not tokens or all(set(token) == {"-"} for token in tokens):
+                    continue
+                rows.append(tokens)
+        if not rows or any(len(row) != len(rows[0]) for row in rows):
+            raise ValueError(f"Puzzle rows must be non-empty and of equal length: {path}")
+
+        clues: Dict[Tuple[int, int], int] = {}
+        for i, row in enumerate(rows):
+            for j, token in enumerate(row):
+                if token in (".", "_"):
+                    continue
+                try:
+                    value = int(token)
+                except ValueError:
+                    raise ValueError(f"Invalid puzzle cell '{token}' at ({i}, {j})")
+                if value != 0:
+                    clues[(i, j)] = value
+        return len(rows), len(rows[0]), clues
+
 import unittest
 
 class TestBoard(unittest.TestCase):
@@ -269,6 +319,12 @@ class TestBoard(unittest.TestCase):
         valid_moves = set(filter(lambda pos: board.is_valid_cell(*pos), expected))
         self.assertEqual(moves, valid_moves)
 
+    def test_available_moves_rule(self):
+        from src.diplomatico.moves import KNIGHT
+        board = Board(3, 3, rule=KNIGHT)
+        self.assertEqual(set(board.available_moves(0, 0)), {(1, 2), (2, 1)})
+        self.assertEqual(board.available_moves(1, 1), [])
+
     def test_clean(self):
         board = Board(2, 2)
         board.board[0][0] = 1
@@ -299,6 +355,15 @@ class TestBoard(unittest.TestCase):
         # Invalid move (occupied cell)
         self.assertFalse(board.move((2, 2), (2, 2)))
 
+    def test_restore(self):
+        board = Board(5, 5)
+        self.assertTrue(board.restore([(0, 0), (2, 2)], (0, 4)))
+        self.assertEqual(board.board[0][4], 3)
+        self.assertEqual(board.step, 4)
+        self.assertTrue(board.move((0, 4), (0, 1)))
+        self.assertFalse(board.restore([(0, 0)], (0, 0)))  # Repeated cell
+        self.assertTrue(board.is_uninitialized())
+
     def test_is_complete(self):
         board = Board(2, 2)
         self.assertFalse(board.is_complete())
@@ -320,6 +385,26 @@ class TestBoard(unittest.TestCase):
         self.assertIn(" 1|  2|", output)
         self.assertIn(" 4|  3|", output)
 
+    def test_read_puzzle(self):
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "puzzle.txt")
+            with open(path, "w") as f:
+                f.write("|17| 0| .|\n------------\n| _| 4|14|\n")
+            self.assertEqual(Board.read_puzzle(path), (2, 3, {(0, 0): 17, (1, 1): 4, (1, 2): 14}))
+
+    def test_read_malformed_puzzle(self):
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "puzzle.txt")
+            for content in ["1 2 3\n4 5\n", "1 x 3\n", "", "-----\n\n"]:
+                with open(path, "w") as f:
+                    f.write(content)
+                with self.assertRaises(ValueError, msg=repr(content)):
+                    Board.read_puzzle(path)
+
     def test_get_unique_nodes_examples(self):
         # 3x3 grid: should yield (0,0), (0,1), (1,1)
         board_3x3 = Board(3, 3)
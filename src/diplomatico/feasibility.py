@@ -0,0 +1,221 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+class FeasibilityChecker:
+    """
+        Class checking cheap necessary conditions for a Hamiltonian path between two anchors, so that
+        impossible (start, end) pairs are rejected before any search.
+        The graph structure (components, degrees, articulation points, bipartition) is analysed once.
+    """
+
+    def __init__(self, neighbors: Sequence[Sequence[int]], c: int):
+        """
+            :param neighbors: For each cell index (row * c + col), the indices of the cells one move away
+            :param c: Number of columns of the board
+        """
+        self.neighbors = neighbors
+        self.c = c
+        self.size = len(neighbors)
+        self.dead_ends = [i for i in range(self.size) if len(neighbors[i]) == 1]
+        self.isolated = [i for i in range(self.size) if len(neighbors[i]) == 0]
+        self.components = self._count_components()
+        self.parts = self._bipartition()
+        # for each articulation point: the number of components left once it is removed, and the
+        # discovery-time interval of one of them when there are exactly two
+        self.cuts: Dict[int, Tuple[int, Optional[Tuple[int, int]]]] = {}
+        self.discovery: List[int] = [-1] * self.size
+        if self.components == 1:
+            self._find_cuts()
+
+    @classmethod
+    def from_board(cls, board) -> "FeasibilityChecker":
+        """
+            Create the checker for the move graph of a board.
+        """
+        return cls(board.table.neighbors, board.c)
+
+    def _count_components(self) -> int:
+        seen = [False] * self.size
+        components = 0
+        for root in range(self.size):
+            if seen[root]:
+                continue
+            components += 1
+            seen[root] = True
+            stack = [root]
+            while stack:
+                for j in self.neighbors[stack.pop()]:
+                    if not seen[j]:
+                        seen[j] = True
+                        stack.append(j)
+        return components
+
+    def _bipartition(self) -> Optional[List[int]]:
+        """
+            Two-color the graph, if it is connected and bipartite.
+
+            :return: The side of each cell, or None
+        """
+        if self.components != 1:
+            return None
+        side = [-1] * self.size
+        side[0] = 0
+        stack = [0]
+        while stack:
+            i = stack.pop()
+            for j in self.neighbors[i]:
+                if side[j] == -1:
+                    side[j] = 1 - side[i]
+                    stack.append(j)
+                elif side[j] == side[i]:
+                    return None
+        return side
+
+    def _find_cuts(self) -> None:
+        """
+            Find the articulation points with an iterative depth-first search, tracking low-links.
+        """
+        discovery, low, subtree = self.discovery, [0] * self.size, [1] * self.size
+        separated: Dict[int, List[int]] = {}
+        discovery[0] = low[0] = 0
+        time = 1
+        stack = [(0, -1, iter(self.neighbors[0]))]
+        while stack:
+            i, parent, children = stack[-1]
+            advanced = False
+            for j in children:
+                if discovery[j] == -1:
+                    discovery[j] = low[j] = time
+                    time += 1
+                    stack.append((j, i, iter(self.neighbors[j])))
+                    advanced = True
+                    break
+                if j != parent:
+                    low[i] = min(low[i], discovery[j])
+            if advanced:
+                continue
+            stack.pop()
+            if parent >= 0:
+                low[parent] = min(low[parent], low[i])
+                subtree[parent] += subtree[i]
+                # the root separates each of its children; any other cell, the children no back edge climbs over
+                if parent == 0 or low[i] >= discovery[parent]:
+                    separated.setdefault(parent, []).append(i)
+
+        for i, children in separated.items():
+            pieces = len(children) + (0 if i == 0 else 1)
+            if pieces >= 2:
+                child = children[-1]
+                interval = (discovery[child], discovery[child] + subtree[child]) if pieces == 2 else None
+                self.cuts[i] = (pieces, interval)
+
+    def _name(self, i: int) -> str:
+        return str(divmod(i, self.c))
+
+    def check(self, start: Optional[Tuple[int, int]] = None, end: Optional[Tuple[int, int]] = None) -> Optional[str]:
+        """
+            Check necessary conditions for a Hamiltonian path between the given anchors.
+            Passing the check does not prove a path exists; failing it proves none does.
+
+            :param start: Optional starting cell as (row, col).
+            :param end: Optional ending cell as (row, col).
+            :return: Why no such path can exist, or None if the pair passes every check.
+        """
+        if self.size < 2:
+            return "the board has fewer than two cells"
+        anchors = [cell[0] * self.c + cell[1] for cell in (start, end) if cell is not None]
+        if len(anchors) == 2 and anchors[0] == anchors[1]:
+            return "the start and end cells coincide"
+
+        if self.isolated:
+            return f"cell {self._name(self.isolated[0])} has no moves"
+        if self.components > 1:
+            return f"the board graph has {self.components} components"
+
+        free = 2 - len(anchors)
+        stranded = [i for i in self.dead_ends if i not in anchors]
+        if len(stranded) > free:
+            return f"dead-end cells {', '.join(map(self._name, stranded))} must all be endpoints, but only {free} endpoint(s) are free"
+
+        for i, (pieces, interval) in self.cuts.items():
+            if pieces > 2:
+                return f"removing cell {self._name(i)} leaves {pieces} components, more than a path can join"
+            if i in anchors:
+                return f"endpoint {self._name(i)} is an articulation point"
+            if len(anchors) == 2 and interval is not None:
+                inside = [interval[0] <= self.discovery[a] < interval[1] for a in anchors]
+                if inside[0] == inside[1]:
+                    return f"both endpoints lie on the same side of articulation point {self._name(i)}"
+
+        if self.parts is not None:
+            counts = [self.parts.count(0), self.parts.count(1)]
+            if abs(counts[0] - counts[1]) > 1:
+                return f"the bipartite board graph has sides of {counts[0]} and {counts[1]} cells"
+            anchor_sides = [self.parts[a] for a in anchors]
+            if counts[0] == counts[1]:
+                if len(anchor_sides) == 2 and anchor_sides[0] == anchor_sides[1]:
+                    return "the sides are equal, so the endpoints must lie on opposite sides of the bipartite board graph"
+            else:
+                larger = 0 if counts[0] > counts[1] else 1
+                if any(side != larger for side in anchor_sides):
+                    return "both endpoints must lie on the larger side of the bipartite board graph"
+        return None
+
+import unittest
+
+class TestFeasibilityChecker(unittest.TestCase):
+    def _line(self, size: int) -> List[List[int]]:
+        return [[j for j in (i - 1, i + 1) if 0 <= j < size] for i in range(size)]
+
+    def test_line(self):
+        checker = FeasibilityChecker(self._line(5), c=5)
+        self.assertIsNone(checker.check((0, 0), (0, 4)))
+        self.assertIsNone(checker.check((0, 0)))
+        self.assertIn("dead-end", checker.check((0, 0), (0, 3)))
+        self.assertIn("dead-end", checker.check((0, 2)))
+
+    def test_three_blocks(self):
+        # three triangles sharing cell 0
+        neighbors = [[1, 2, 3, 4, 5, 6], [0, 2], [0, 1], [0, 4], [0, 3], [0, 6], [0, 5]]
+        self.assertIn("3 components", FeasibilityChecker(neighbors, c=7).check())
+
+    def test_same_side(self):
+        # two triangles joined through cell 2: a path must cross it
+        neighbors = [[1, 2], [0, 2], [0, 1, 3, 4], [2, 4], [2, 3]]
+        checker = FeasibilityChecker(neighbors, c=5)
+        self.assertIsNone(checker.check((0, 0), (0, 4)))
+        self.assertIn("same side", checker.check((0, 0), (0, 1)))
+        self.assertIn("articulation point", checker.check((0, 2)))
+
+    def test_disconnected(self):
+        from src.diplomatico.moves import DIPLOMATICO
+        table = DIPLOMATICO.compile(3, 5)
+        self.assertIsNotNone(FeasibilityChecker(table.neighbors, c=5).check())
+
+    def test_bipartite(self):
+        from src.diplomatico.moves import KNIGHT
+        checker = FeasibilityChecker(KNIGHT.compile(5, 5).neighbors, c=5)
+        self.assertIn("larger side", checker.check((0, 0), (0, 1)))
+        self.assertIsNone(checker.check((0, 0), (0, 2)))
+
+    def test_never_rejects_solutions(self):
+        from src.diplomatico.moves import DIPLOMATICO, KNIGHT
+        for rule, r, c in [(DIPLOMATICO, 4, 5), (KNIGHT, 3, 4)]:
+            neighbors = rule.compile(r, c).neighbors
+            checker = FeasibilityChecker(neighbors, c)
+            size = r * c
+
+            def extend(path: List[int]):
+                if len(path) == size:
+                    yield path
+                    return
+                for j in neighbors[path[-1]]:
+                    if j not in path:
+                        yield from extend(path + [j])
+
+            ends = {(path[0], path[-1]) for start in range(size) for path in extend([start])}
+            self.assertTrue(ends)
+            for start, end in ends:
+                self.assertIsNone(checker.check(divmod(start, c), divmod(end, c)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from src.diplomatico.moves import MoveTable
+
+class Frontier:
+    """
+        Class representing the partial paths of a breadth-first search level, as parallel arrays.
+        Paths reaching the same cell through the same set of cells are interchangeable for the rest of the
+        search, so they are merged into one state whose multiplicity counts them.
+    """
+
+    def __init__(self, visited: np.ndarray, current: np.ndarray, counts: np.ndarray,
+                 prefixes: Optional[np.ndarray] = None):
+        """
+            :param visited: 2-D uint64 array of occupancy bitmasks, one row per state, bit i of word i // 64 for cell i
+            :param current: The cell index (row * c + col) each state ends at
+            :param counts: The number of partial paths merged into each state
+            :param prefixes: Optional 2-D array of the cell indices of each partial path, kept instead of merging
+        """
+        self.visited = visited
+        self.current = current
+        self.counts = counts
+        self.prefixes = prefixes
+
+    def __len__(self):
+        return len(self.current)
+
+    def cells(self, i: int) -> Tuple[int, ...]:
+        """
+            Get the visited cell indices of a state.
+
+            :param i: The index of the state
+            :return: The visited cell indices, in increasing order
+        """
+        return tuple(
+            word * 64 + bit
+            for word, mask in enumerate(self.visited[i].tolist())
+            for bit in range(64) if mask >> bit & 1
+        )
+
+def _neighbor_array(table: MoveTable) -> np.ndarray:
+    """
+        Pad the neighbor tables of a move table into a 2-D array, with -1 for missing moves.
+    """
+    width = max([len(cells) for cells in table.neighbors] + [1])
+    neighbors = np.full((len(table.neighbors), width), -1, dtype=np.int64)
+    for i, cells in enumerate(table.neighbors):
+        neighbors[i, :len(cells)] = cells
+    return neighbors
+
+def expand_frontier(table: MoveTable, starts: Iterable[int], k: int, end: Optional[int] = None,
+                    prefixes: bool = False) -> Frontier:
+    """
+        Expand the first k levels of the Hamiltonian path search tree breadth-first, all states of a level at once.
+
+        :param table: The compiled move table of the board.
+        :param starts: The starting cell indices.
+        :param k: The number of moves to expand; capped to the number of moves of a full path.
+        :param end: Optional ending cell index, which paths may only reach with the last move of a full path.
+        :param prefixes: Whether to keep the partial paths themselves; states are then not merged.
+        :return: The states after the k-th move.
+    """
+    size = table.r * table.c
+    words = max((size + 63) // 64, 1)
+    neighbors = _neighbor_array(table)
+
+    current = np.array(list(starts), dtype=np.int64)
+    visited = np.zeros((len(current), words), dtype=np.uint64)
+    rows = np.arange(len(current))
+    visited[rows, current // 64] = np.left_shift(np.uint64(1), (current % 64).astype(np.uint64))
+    counts = np.ones(len(current), dtype=np.int64)
+    paths = current[:, None].copy() if prefixes else None
+
+    for level in range(1, min(k, size - 1) + 1):
+        # every (state, move) pair, kept if the move lands on an unvisited cell
+        candidates = neighbors[current]
+        parent, slot = np.nonzero(candidates >= 0)
+        target = candidates[parent, slot]
+        word, bit = target // 64, (target % 64).astype(np.uint64)
+        free = (visited[parent, word] >> bit) & np.uint64(1) == 0
+        if end is not None:
+            free &= (target == end) if level == size - 1 else (target != end)
+        parent, target, word, bit = parent[free], target[free], word[free], bit[free]
+
+        visited = visited[parent]
+        visited[np.arange(len(parent)), word] |= np.left_shift(np.uint64(1), bit)
+        current = target
+        counts = counts[parent]
+        if prefixes:
+            paths = np.concatenate([paths[parent], current[:, None]], axis=1)
+        elif len(current):
+            # merge the states reaching the same cell through the same set of cells
+            keys = np.concatenate([visited, current[:, None].astype(np.uint64)], axis=1)
+            keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+            merged = np.zeros(len(keys), dtype=np.int64)
+            np.add.at(merged, inverse.reshape(-1), counts)
+            visited, current, counts = keys[:, :words], keys[:, words].astype(np.int64), merged
+
+    return Frontier(visited, current, counts, paths)
+
+import unittest
+
+class TestFrontier(unittest.TestCase):
+    def _walks(self, table: MoveTable, path: Tuple[int, ...], k: int):
+        if len(path) == k + 1:
+            yield path
+            return
+        for j in table.neighbors[path[-1]]:
+            if j not in path:
+                yield from self._walks(table, path + (j,), k)
+
+    def test_matches_enumeration(self):
+        from src.diplomatico.moves import DIPLOMATICO
+        table = DIPLOMATICO.compile(5, 5)
+        frontier = expand_frontier(table, range(25), 4)
+        walks = [walk for start in range(25) for walk in self._walks(table, (start,), 4)]
+        self.assertEqual(int(frontier.counts.sum()), len(walks))
+        expected = {}
+        for walk in walks:
+            key = (tuple(sorted(walk)), walk[-1])
+            expected[key] = expected.get(key, 0) + 1
+        actual = {(frontier.cells(i), int(frontier.current[i])): int(frontier.counts[i]) for i in range(len(frontier))}
+        self.assertEqual(actual, expected)
+
+    def test_prefixes(self):
+        from src.diplomatico.moves import KNIGHT
+        table = KNIGHT.compile(4, 4)
+        frontier = expand_frontier(table, [0], 3, prefixes=True)
+        self.assertEqual(sorted(map(tuple, frontier.prefixes.tolist())), sorted(self._walks(table, (0,), 3)))
+        self.assertTrue((frontier.counts == 1).all())
+
+    def test_end_reached_last(self):
+        from src.diplomatico.moves import DIPLOMATICO
+        table = DIPLOMATICO.compile(4, 5)
+        frontier = expand_frontier(table, [0], 6, end=3)
+        self.assertNotIn(3, frontier.current.tolist())
+
+    def test_wide_board(self):
+        from src.diplomatico.moves import DIPLOMATICO
+        table = DIPLOMATICO.compile(9, 9)
+        frontier = expand_frontier(table, [80], 2)
+        self.assertEqual(frontier.visited.shape[1], 2)
+        self.assertTrue(all(80 in frontier.cells(i) for i in range(len(frontier))))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from src.diplomatico.board import Board
+from src.diplomatico.feasibility import FeasibilityChecker
 import unittest
 
 class Node:
@@ -30,6 +31,7 @@ class BoardGraph:
             for _ in range(len(self.nodes))
         ]
         self._set_adjacency_matrix()
+        self._feasibility: Optional[FeasibilityChecker] = None
 
     def _create_nodes(self) -> List[Node]:
         """
@@ -43,16 +45,32 @@ class BoardGraph:
                 nodes.append(Node(r, c))
         return nodes
     
+    @property
+    def neighbors(self) -> Tuple[Tuple[int, ...], ...]:
+        """
+            Get the neighbor lists of the graph, shared with the board's compiled move table.
+
+            :return: For each node index (row * c + col), the indices of its neighbors
+        """
+        return self.board.table.neighbors
+
+    @property
+    def feasibility(self) -> FeasibilityChecker:
+        """
+            Get the checker rejecting impossible (start, end) pairs, analysing the graph on the first request.
+        """
+        if self._feasibility is None:
+            self._feasibility = FeasibilityChecker(self.neighbors, self.board.c)
+        return self._feasibility
+
     def _set_adjacency_matrix(self) -> List[List[int]]:
         """
-            Set the adjacency matrix based on the board's available moves.
+            Set the adjacency matrix based on the board's move table.
 
             :return: The adjacency matrix as a list of lists
         """
-        for i, node1 in enumerate(self.nodes):
-            moves: List[Tuple[int, int]] = self.board.available_moves(node1.r, node1.c)
-            for move in moves:
-                j = self.board.c * move[0] + move[1]
+        for i, cells in enumerate(self.neighbors):
+            for j in cells:
                 self.adjacency_matrix[i][j] = 1
         return self.adjacency_matrix
 
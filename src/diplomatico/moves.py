@@ -0,0 +1,213 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class MoveTable:
+    """
+        Class representing the neighbor tables of a move rule compiled for a given board size.
+    """
+
+    def __init__(self, r: int, c: int, neighbors: List[List[int]]):
+        """
+        Initialize the table from the neighbors of each cell.
+
+            :param r: Number of rows
+            :param c: Number of columns
+            :param neighbors: For each cell index (row * c + col), the indices of the cells one move away
+        """
+        self.r: int = r
+        self.c: int = c
+        self.neighbors: Tuple[Tuple[int, ...], ...] = tuple(tuple(cells) for cells in neighbors)
+        self.moves: Tuple[Tuple[Tuple[int, int], ...], ...] = tuple(
+            tuple(divmod(j, c) for j in cells) for cells in self.neighbors
+        )
+
+    def degree(self, i: int) -> int:
+        """
+        Get the number of moves available from a cell on the empty board.
+
+        :param i: The cell index (row * c + col)
+        :return: The number of neighbors of the cell
+        """
+        return len(self.neighbors[i])
+
+class MoveRule:
+    """
+        Class representing a leaper move rule, i.e. a set of (row, col) offsets a piece can jump by.
+        Neighbor tables are compiled once per board size and cached in-process, and optionally on disk:
+        in the directory given to `compile` or, by default, in `MoveRule.cache_dir`, so that every board
+        (and every `Board` built by the solvers and connections) shares it once it is set.
+    """
+
+    _tables: Dict[Tuple[Tuple[Tuple[int, int], ...], int, int], MoveTable] = {}
+    cache_dir: Optional[str] = None
+
+    def __init__(self, offsets: Iterable[Tuple[int, int]], name: str = "custom"):
+        """
+        Initialize the rule with the given offsets.
+
+            :param offsets: The (row, col) offsets of the moves, in the order moves should be tried
+            :param name: The name of the rule, used for lookups and on-disk cache files
+        """
+        self.offsets: Tuple[Tuple[int, int], ...] = tuple((dr, dc) for dr, dc in offsets)
+        self.name: str = name
+
+    def __repr__(self):
+        return f"MoveRule({self.name}, {list(self.offsets)})"
+
+    @classmethod
+    def leaper(cls, a: int, b: int, name: Optional[str] = None) -> "MoveRule":
+        """
+        Create the (a, b)-leaper rule, e.g. (1, 2) for the chess knight.
+
+        :param a: The first offset of the leap
+        :param b: The second offset of the leap
+        :param name: The name of the rule; defaults to 'a,b'
+        :return: The move rule with all the distinct (±a, ±b) and (±b, ±a) offsets
+        """
+        offsets: List[Tuple[int, int]] = []
+        for dr, dc in [(a, b), (b, a)]:
+            for sr, sc in [(1, 1), (-1, 1), (1, -1), (-1, -1)]:
+                if (sr * dr, sc * dc) not in offsets:
+                    offsets.append((sr * dr, sc * dc))
+        return cls(offsets, name=name or f"{a},{b}")
+
+    @staticmethod
+    def from_str(val: str) -> "MoveRule":
+        """
+        Get a move rule by name, or the leaper rule for 'a,b'.
+
+        :param val: The name of a known rule, or the leap as 'a,b'
+        :return: The move rule
+        """
+        if val.lower() in RULES:
+            return RULES[val.lower()]
+        try:
+            a, b = map(int, val.split(","))
+        except ValueError:
+            raise ValueError(f"Unknown MoveRule: {val}")
+        return MoveRule.leaper(a, b)
+
+    def compile(self, r: int, c: int, cache_dir: Optional[str] = None) -> MoveTable:
+        """
+        Get the neighbor tables of the rule for a board of the given size, compiling them on the first request.
+
+        :param r: Number of rows
+        :param c: Number of columns
+        :param cache_dir: Optional directory where compiled tables are read from and written to;
+            defaults to `MoveRule.cache_dir`
+        :return: The compiled move table
+        """
+        key = (self.offsets, r, c)
+        if key in MoveRule._tables:
+            return MoveRule._tables[key]
+        if cache_dir is None:
+            cache_dir = MoveRule.cache_dir
+
+        neighbors = self._load(r, c, cache_dir) if cache_dir else None
+        if neighbors is None:
+            neighbors = []
+            for i in range(r):
+                for j in range(c):
+                    cells = []
+                    for dr, dc in self.offsets:
+                        new_row, new_col = i + dr, j + dc
+                        if 0 <= new_row < r and 0 <= new_col < c:
+                            cells.append(new_row * c + new_col)
+                    neighbors.append(cells)
+            if cache_dir:
+                self._save(r, c, cache_dir, neighbors)
+
+        table = MoveTable(r, c, neighbors)
+        MoveRule._tables[key] = table
+        return table
+
+    def _cache_path(self, r: int, c: int, cache_dir: str) -> str:
+        return os.path.join(cache_dir, f"{self.name}_{r}x{c}.json")
+
+    def _load(self, r: int, c: int, cache_dir: str) -> Optional[List[List[int]]]:
+        """
+        Load compiled neighbor tables from disk.
+
+        :return: The neighbor tables, or None if missing or compiled for different offsets
+        """
+        try:
+            with open(self._cache_path(r, c, cache_dir)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if [tuple(offset) for offset in data.get("offsets", [])] != list(self.offsets):
+            return None
+        return data.get("neighbors")
+
+    def _save(self, r: int, c: int, cache_dir: str, neighbors: List[List[int]]) -> None:
+        """
+        Save compiled neighbor tables to disk.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(self._cache_path(r, c, cache_dir), "w") as f:
+            json.dump({"offsets": self.offsets, "neighbors": neighbors}, f)
+
+DIPLOMATICO = MoveRule([
+    (2, 2), (-2, 2), (2, -2), (-2, -2),
+    (0, 3), (0, -3), (3, 0), (-3, 0)
+], name="diplomatico")
+KNIGHT = MoveRule.leaper(1, 2, name="knight")
+
+RULES: Dict[str, MoveRule] = {rule.name: rule for rule in [DIPLOMATICO, KNIGHT]}
+
+import unittest
+
+class TestMoveRule(unittest.TestCase):
+    def test_diplomatico_table(self):
+        table = DIPLOMATICO.compile(5, 5)
+        self.assertEqual(set(table.moves[2 * 5 + 2]), {(4, 4), (0, 4), (4, 0), (0, 0)})
+        self.assertEqual(set(table.moves[0]), {(2, 2), (0, 3), (3, 0)})
+        self.assertEqual(table.degree(0), 3)
+
+    def test_symmetric_table(self):
+        table = DIPLOMATICO.compile(4, 7)
+        for i, cells in enumerate(table.neighbors):
+            for j in cells:
+                self.assertIn(i, table.neighbors[j])
+
+    def test_in_process_cache(self):
+        self.assertIs(DIPLOMATICO.compile(3, 4), DIPLOMATICO.compile(3, 4))
+
+    def test_disk_cache(self):
+        import tempfile
+        rule = MoveRule.leaper(1, 3, name="camel")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            table = rule.compile(4, 5, cache_dir=cache_dir)
+            self.assertTrue(os.path.exists(os.path.join(cache_dir, "camel_4x5.json")))
+            MoveRule._tables.pop((rule.offsets, 4, 5))
+            self.assertEqual(rule.compile(4, 5, cache_dir=cache_dir).neighbors, table.neighbors)
+
+    def test_default_cache_dir(self):
+        import tempfile
+        from src.diplomatico.board import Board
+        rule = MoveRule.leaper(1, 4, name="giraffe")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            MoveRule.cache_dir = cache_dir
+            try:
+                board = Board(5, 6, rule=rule)
+            finally:
+                MoveRule.cache_dir = None
+            self.assertTrue(os.path.exists(os.path.join(cache_dir, "giraffe_5x6.json")))
+            MoveRule._tables.pop((rule.offsets, 5, 6))
+            self.assertEqual(rule.compile(5, 6, cache_dir=cache_dir).neighbors, board.table.neighbors)
+
+    def test_knight(self):
+        self.assertEqual(len(KNIGHT.offsets), 8)
+        table = KNIGHT.compile(8, 8)
+        self.assertEqual(table.degree(0), 2)
+        self.assertEqual(table.degree(3 * 8 + 3), 8)
+
+    def test_from_str(self):
+        self.assertIs(MoveRule.from_str("Diplomatico"), DIPLOMATICO)
+        self.assertEqual(len(MoveRule.from_str("1,1").offsets), 4)
+        with self.assertRaises(ValueError):
+            MoveRule.from_str("bishop")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+class PathStatistics:
+    """
+        Class aggregating per-cell statistics of Hamiltonian paths as they are found, without storing them:
+        how often each step number lands on each cell, and how often each cell starts or ends a path.
+        The memory used only depends on the board size.
+    """
+
+    def __init__(self, r: int, c: int):
+        """
+            :param r: Number of rows
+            :param c: Number of columns
+        """
+        self.r: int = r
+        self.c: int = c
+        self.steps: np.ndarray = np.zeros((r, c, r * c), dtype=np.int64)
+        self.starts: np.ndarray = np.zeros((r, c), dtype=np.int64)
+        self.ends: np.ndarray = np.zeros((r, c), dtype=np.int64)
+        self.total: int = 0
+        self._order = np.arange(r * c)
+
+    def add(self, path: List[Tuple[int, int]]) -> None:
+        """
+            Count a Hamiltonian path; the path is only read, so it may be reused by the caller afterwards.
+
+            :param path: The path as a list of (row, col) tuples.
+        """
+        if len(path) != self.r * self.c:
+            raise ValueError(f"Expected a path of {self.r * self.c} cells, got {len(path)}")
+        rows, cols = zip(*path)
+        self.steps[rows, cols, self._order] += 1
+        self.starts[path[0]] += 1
+        self.ends[path[-1]] += 1
+        self.total += 1
+
+    __call__ = add
+
+    def merge(self, other: "PathStatistics") -> None:
+        """
+            Add the statistics of another aggregation on a board of the same size.
+        """
+        if (other.r, other.c) != (self.r, self.c):
+            raise ValueError(f"Cannot merge statistics of a {other.r}x{other.c} board into a {self.r}x{self.c} one")
+        self.steps += other.steps
+        self.starts += other.starts
+        self.ends += other.ends
+        self.total += other.total
+
+    def grid(self, values: np.ndarray) -> Dict[Tuple[int, int], float]:
+        """
+            Convert an r x c array into a dictionary keyed by (row, col), as taken by the heatmaps.
+        """
+        return {(i, j): float(values[i, j]) for i in range(self.r) for j in range(self.c)}
+
+    def step(self, k: int) -> np.ndarray:
+        """
+            Get how often each cell is visited at the given step.
+
+            :param k: The step number, from 1 to r * c.
+            :return: An r x c array of counts.
+        """
+        if not 1 <= k <= self.r * self.c:
+            raise ValueError(f"Invalid step: {k}")
+        return self.steps[:, :, k - 1]
+
+    def mean_step(self) -> Optional[np.ndarray]:
+        """
+            Get the average step number at which each cell is visited, or None if no path was counted.
+        """
+        if not self.total:
+            return None
+        return (self.steps * np.arange(1, self.r * self.c + 1)).sum(axis=2) / self.total
+
+import unittest
+
+class TestPathStatistics(unittest.TestCase):
+    def setUp(self):
+        self.paths = [
+            [(0, 0), (0, 1), (1, 1), (1, 0)],
+            [(1, 0), (1, 1), (0, 1), (0, 0)],
+            [(0, 0), (1, 0), (1, 1), (0, 1)],
+        ]
+
+    def test_add(self):
+        stats = PathStatistics(2, 2)
+        for path in self.paths:
+            stats.add(path)
+        self.assertEqual(stats.total, 3)
+        self.assertEqual(stats.starts.tolist(), [[2, 0], [1, 0]])
+        self.assertEqual(stats.ends.tolist(), [[1, 1], [1, 0]])
+        self.assertEqual(stats.step(1).tolist(), stats.starts.tolist())
+        self.assertEqual(stats.step(4).tolist(), stats.ends.tolist())
+        self.assertTrue((stats.steps.sum(axis=2) == 3).all())
+        self.assertAlmostEqual(stats.mean_step()[0, 0], (1 + 4 + 1) / 3)
+
+    def test_merge(self):
+        first, second = PathStatistics(2, 2), PathStatistics(2, 2)
+        first(self.paths[0])
+        second(self.paths[1])
+        first.merge(second)
+        self.assertEqual(first.total, 2)
+        self.assertEqual(first.grid(first.starts), {(0, 0): 1.0, (0, 1): 0.0, (1, 0): 1.0, (1, 1): 0.0})
+
+    def test_invalid(self):
+        stats = PathStatistics(2, 2)
+        with self.assertRaises(ValueError):
+            stats.add(self.paths[0][:3])
+        with self.assertRaises(ValueError):
+            stats.step(5)
+        self.assertIsNone(stats.mean_step())
+
+if __name__ == "__main__":
+    unittest.main()
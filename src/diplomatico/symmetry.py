@@ -0,0 +1,185 @@
+import hashlib
+from array import array
+from typing import List, Sequence, Set, Tuple, Union
+
+Path = Sequence[Union[Tuple[int, int], int]]
+
+def board_symmetries(board) -> List[List[int]]:
+    """
+        Get the symmetries of a board that also preserve its move rule, as permutations of the cell indices
+        (row * c + col): the reflections and the half turn of any board and, when it is square, the quarter
+        turns and the diagonal reflections too; these are the symmetries `Board.get_unique_nodes` relies on.
+
+        :param board: The board.
+        :return: For each symmetry, the image of every cell index; the identity comes first.
+    """
+    r, c = board.r, board.c
+    offsets = set(board.rule.offsets)
+    symmetries: List[List[int]] = []
+    for transpose in ([False, True] if r == c else [False]):
+        for flip_rows in (False, True):
+            for flip_cols in (False, True):
+                def image(row: int, col: int) -> Tuple[int, int]:
+                    if flip_rows:
+                        row = r - 1 - row
+                    if flip_cols:
+                        col = c - 1 - col
+                    return (col, row) if transpose else (row, col)
+
+                # the image of each move must be a move, or paths would not map to paths
+                moved = {(-dr if flip_rows else dr, -dc if flip_cols else dc) for dr, dc in offsets}
+                if transpose:
+                    moved = {(dc, dr) for dr, dc in moved}
+                if moved != offsets:
+                    continue
+                images = [image(*divmod(i, c)) for i in range(r * c)]
+                symmetries.append([row * c + col for row, col in images])
+    return symmetries
+
+class SymmetryCanonicalizer:
+    """
+        Class mapping each Hamiltonian path to a canonical encoding shared by all its images under the board
+        symmetries and, optionally, path reversal: the minimum encoding over these images.
+    """
+
+    def __init__(self, board, reversal: bool = True):
+        """
+            :param board: The board of the paths.
+            :param reversal: Whether a path and its reverse are the same solution.
+        """
+        self.c = board.c
+        self.size = board.size()
+        self.symmetries = board_symmetries(board)
+        self.reversal = reversal
+
+    def _cells(self, path: Path) -> List[int]:
+        """
+            Get the cell indices of a path given as (row, col) tuples or as cell indices.
+        """
+        if path and isinstance(path[0], tuple):
+            return [row * self.c + col for row, col in path]   # type: ignore
+        return list(path)   # type: ignore
+
+    def _encode(self, cells: List[int]) -> bytes:
+        # one byte per cell when they fit; otherwise the order of the encodings is not the order of the
+        # paths, but it is still a fixed total order, so the minimum is still canonical
+        return bytes(cells) if self.size <= 256 else array("I", cells).tobytes()
+
+    def canonical(self, path: Path) -> bytes:
+        """
+            Get the canonical encoding of a path.
+
+            :param path: The path as (row, col) tuples or as cell indices (row * c + col).
+            :return: The smallest encoding among the images of the path.
+        """
+        cells = self._cells(path)
+        orientations = [cells, cells[::-1]] if self.reversal else [cells]
+        return min(self._encode([symmetry[i] for i in oriented])
+                   for symmetry in self.symmetries for oriented in orientations)
+
+    def digest(self, path: Path, size: int = 16) -> bytes:
+        """
+            Get a fixed-size hash of the canonical encoding of a path, as a compact key for deduplication.
+
+            :param path: The path as (row, col) tuples or as cell indices (row * c + col).
+            :param size: The size of the hash in bytes.
+        """
+        return hashlib.blake2b(self.canonical(path), digest_size=size).digest()
+
+class SolutionDeduplicator:
+    """
+        Class counting the distinct solutions up to symmetry as they stream in, by keeping only the digests
+        of their canonical encodings: the memory used depends on the number of distinct solutions and on the
+        digest size, not on the length of the paths. Two distinct solutions could share a digest, which
+        becomes likely only past about 2 ** (4 * digest_size) of them.
+    """
+
+    def __init__(self, board, reversal: bool = True, digest_size: int = 16):
+        """
+            :param board: The board of the solutions.
+            :param reversal: Whether a path and its reverse are the same solution.
+            :param digest_size: The size of the kept digests in bytes.
+        """
+        self.canonicalizer = SymmetryCanonicalizer(board, reversal=reversal)
+        self.digest_size = digest_size
+        self.seen: Set[bytes] = set()
+        self.total = 0
+
+    def add(self, path: Path) -> bool:
+        """
+            Count a solution; the path is only read, so it may be reused by the caller afterwards.
+
+            :param path: The path as (row, col) tuples or as cell indices (row * c + col).
+            :return: Whether no image of the solution was counted before.
+        """
+        self.total += 1
+        key = self.canonicalizer.digest(path, size=self.digest_size)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        return True
+
+    __call__ = add
+
+    def __len__(self):
+        return len(self.seen)
+
+import unittest
+
+class TestSymmetry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from src.diplomatico.board import Board
+        from src.solver import Solver
+        cls.paths = Solver(Board(4, 5)).solve()
+
+    def test_symmetries(self):
+        from src.diplomatico.board import Board
+        from src.diplomatico.moves import MoveRule
+        self.assertEqual(len(board_symmetries(Board(5, 5))), 8)
+        self.assertEqual(len(board_symmetries(Board(4, 5))), 4)
+        self.assertEqual(board_symmetries(Board(4, 5))[0], list(range(20)))
+        # moves to the right only are kept by the vertical flip alone
+        self.assertEqual(len(board_symmetries(Board(3, 3, rule=MoveRule([(0, 1), (1, 1), (-1, 1)])))), 2)
+
+    def test_invariant(self):
+        from src.diplomatico.board import Board
+        from src.sampler import BackbiteSampler
+        for board in (Board(6, 6), Board(5, 7), Board(17, 17)):
+            canonicalizer = SymmetryCanonicalizer(board)
+            for path in BackbiteSampler(board, seed=2).sample(3):
+                expected = canonicalizer.canonical(path)
+                for symmetry in canonicalizer.symmetries:
+                    image = [symmetry[i] for i in path]
+                    self.assertEqual(canonicalizer.canonical(image), expected)
+                    self.assertEqual(canonicalizer.canonical(image[::-1]), expected)
+
+    def test_deduplicate(self):
+        from src.diplomatico.board import Board
+        board = Board(4, 5)
+        paths = self.paths
+        dedup = SolutionDeduplicator(board)
+        for path in paths:
+            dedup(path)
+        self.assertEqual(dedup.total, 144)
+        # every class holds the distinct images of one path, at most 4 symmetries times 2 directions
+        classes = {}
+        for path in paths:
+            classes.setdefault(dedup.canonicalizer.canonical(path), set()).add(tuple(path))
+        self.assertEqual(len(dedup), len(classes))
+        self.assertTrue(all(len(images) <= 8 for images in classes.values()))
+        self.assertEqual(sum(len(images) for images in classes.values()), 144)
+        self.assertFalse(dedup.add(paths[0]))
+        self.assertFalse(dedup.add(paths[0][::-1]))
+
+    def test_without_reversal(self):
+        from src.diplomatico.board import Board
+        with_reversal, without_reversal = SolutionDeduplicator(Board(4, 5)), SolutionDeduplicator(Board(4, 5), reversal=False)
+        for path in self.paths:
+            with_reversal(path)
+            without_reversal([row * 5 + col for row, col in path])
+        self.assertGreater(len(without_reversal), len(with_reversal))
+        self.assertLessEqual(len(without_reversal), 2 * len(with_reversal))
+
+if __name__ == "__main__":
+    unittest.main()
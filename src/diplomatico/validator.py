@@ -0,0 +1,136 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from src.diplomatico.frontier import _neighbor_array
+from src.diplomatico.moves import MoveRule, DIPLOMATICO
+
+def encode_paths(paths: Iterable[List[Tuple[int, int]]], c: int) -> np.ndarray:
+    """
+        Encode paths of (row, col) tuples as a 2-D array of cell indices (row * c + col), one row per path.
+
+        :param paths: The paths to encode, all of the same length.
+        :param c: The number of columns of the board.
+        :return: The encoded paths.
+    """
+    rows = [[row * c + col for row, col in path] for path in paths]
+    if not rows:
+        return np.zeros((0, 0), dtype=np.int32)
+    return np.array(rows, dtype=np.int32)
+
+def validate_paths(paths: np.ndarray, r: int, c: int, rule: MoveRule = DIPLOMATICO,
+                   chunk_size: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+    """
+        Validate a batch of Hamiltonian paths at once.
+        A row is valid if it is a permutation of all the cell indices and every consecutive pair is one move apart.
+
+        :param paths: 2-D integer array of cell indices (row * c + col), one row per path.
+        :param r: The number of rows of the board.
+        :param c: The number of columns of the board.
+        :param rule: The move rule of the game.
+        :param chunk_size: The number of rows validated together, bounding the temporary memory.
+        :return: The per-row validity, and the per-row index of the first failing step (-1 for valid rows).
+    """
+    paths = np.asarray(paths)
+    if paths.ndim != 2:
+        raise ValueError(f"Expected a 2-D array of paths, got shape {paths.shape}")
+    size = r * c
+    count, length = paths.shape
+    first_failure = np.full(count, min(length, size), dtype=np.int64)
+    if length != size or size == 0:
+        return np.zeros(count, dtype=bool), first_failure
+
+    # moves are looked up in the padded neighbor table, linear in the number of cells
+    neighbors = _neighbor_array(rule.compile(r, c))
+    steps = np.arange(size)
+
+    for begin in range(0, count, chunk_size):
+        chunk = paths[begin:begin + chunk_size]
+        failure = np.full(len(chunk), size, dtype=np.int64)
+
+        in_range = (chunk >= 0) & (chunk < size)
+        failure = np.minimum(failure, np.where(in_range, size, steps).min(axis=1))
+        cells = np.where(in_range, chunk, 0).astype(np.int64)
+
+        # a repeated cell fails at its second occurrence, which a stable sort keeps after the first
+        order = np.argsort(cells, axis=1, kind="stable")
+        ordered = np.take_along_axis(cells, order, axis=1)
+        repeated = ordered[:, 1:] == ordered[:, :-1]
+        failure = np.minimum(failure, np.where(repeated, order[:, 1:], size).min(axis=1, initial=size))
+
+        legal = (neighbors[cells[:, :-1]] == cells[:, 1:, None]).any(axis=2)
+        failure = np.minimum(failure, np.where(legal, size, steps[1:]).min(axis=1, initial=size))
+
+        first_failure[begin:begin + chunk_size] = failure
+
+    valid = first_failure == size
+    first_failure[valid] = -1
+    return valid, first_failure
+
+import unittest
+
+class TestValidator(unittest.TestCase):
+    def setUp(self):
+        # the 5x5 example solution
+        grid = [
+            [17, 9, 2, 16, 8],
+            [4, 14, 19, 5, 13],
+            [1, 22, 25, 10, 21],
+            [18, 6, 3, 15, 7],
+            [24, 11, 20, 23, 12],
+        ]
+        path = [(0, 0)] * 25
+        for i, row in enumerate(grid):
+            for j, value in enumerate(row):
+                path[value - 1] = (i, j)
+        self.path = path
+
+    def test_encode_paths(self):
+        encoded = encode_paths([[(0, 0), (1, 2)], [(2, 1), (0, 0)]], c=3)
+        self.assertEqual(encoded.tolist(), [[0, 5], [7, 0]])
+
+    def test_valid(self):
+        valid, failure = validate_paths(encode_paths([self.path, self.path[::-1]], c=5), 5, 5)
+        self.assertEqual(valid.tolist(), [True, True])
+        self.assertEqual(failure.tolist(), [-1, -1])
+
+    def test_illegal_move(self):
+        paths = encode_paths([self.path], c=5)
+        paths[0, [3, 4]] = paths[0, [4, 3]]
+        valid, failure = validate_paths(paths, 5, 5)
+        self.assertFalse(valid[0])
+        self.assertEqual(failure[0], 3)
+
+    def test_repeated_cell(self):
+        paths = encode_paths([self.path], c=5)
+        paths[0, 20] = paths[0, 10]
+        valid, failure = validate_paths(paths, 5, 5)
+        self.assertFalse(valid[0])
+        self.assertEqual(failure[0], 20)
+
+    def test_out_of_range(self):
+        paths = encode_paths([self.path], c=5)
+        paths[0, 7] = 25
+        valid, failure = validate_paths(paths, 5, 5)
+        self.assertFalse(valid[0])
+        self.assertEqual(failure[0], 7)
+
+    def test_wrong_length(self):
+        valid, failure = validate_paths(encode_paths([self.path[:-1]], c=5), 5, 5)
+        self.assertFalse(valid[0])
+        self.assertEqual(failure[0], 24)
+
+    def test_too_long(self):
+        valid, failure = validate_paths(encode_paths([self.path + self.path[:1]], c=5), 5, 5)
+        self.assertFalse(valid[0])
+        self.assertEqual(failure[0], 25)
+
+    def test_chunks(self):
+        paths = np.repeat(encode_paths([self.path], c=5), 10, axis=0)
+        paths[7, 1] = paths[7, 0]
+        valid, failure = validate_paths(paths, 5, 5, chunk_size=3)
+        self.assertEqual(valid.sum(), 9)
+        self.assertEqual(failure[7], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,284 @@
+import math
+import random
+import time
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+from src.diplomatico.board import Board
+from src.solver import Solver
+
+class Estimate:
+    """
+        Class representing a Monte Carlo estimate, with its confidence interval.
+    """
+
+    def __init__(self, value: float, error: float, confidence: float, hits: Optional[int] = None, probes: Optional[int] = None):
+        """
+            :param value: The estimated value.
+            :param error: The half-width of the confidence interval.
+            :param confidence: The confidence level of the interval, e.g. 0.95.
+            :param hits: Optional number of probes that contributed to the value, e.g. that reached a solution;
+                with none, the value is unknown rather than zero, and the interval unbounded.
+            :param probes: The number of probes, when the hits are given.
+        """
+        self.value = value
+        self.error = math.inf if hits == 0 else error
+        self.confidence = confidence
+        self.hits = hits
+        self.probes = probes
+
+    @property
+    def hit_rate_bound(self) -> Optional[float]:
+        """
+            Get the one-sided upper bound on the probability that a probe hits, when none did: the rule of three
+            (3 / probes at 95%) for the confidence level.
+        """
+        if self.hits != 0 or not self.probes:
+            return None
+        return -math.log(1 - self.confidence) / self.probes
+
+    @property
+    def low(self) -> float:
+        return max(self.value - self.error, 0.0)
+
+    @property
+    def high(self) -> float:
+        return self.value + self.error
+
+    def __repr__(self):
+        if self.hits == 0:
+            return (f"unknown (no hit in {self.probes} probes; hit rate below {self.hit_rate_bound:.2g} "
+                    f"at {self.confidence:.0%}, by the rule of three)")
+        hits = f", {self.hits} of {self.probes} probes hit" if self.hits is not None else ""
+        return f"{self.value:.4g} (±{self.error:.2g}, {self.confidence:.0%} CI [{self.low:.4g}, {self.high:.4g}]{hits})"
+
+class SearchTreeEstimator:
+    """
+        Estimator of the size of the backtracking search of `Solver`, by Knuth's random probes.
+
+        A probe walks down the search tree from the root, picking one move at random at every level, and
+        weighs each level by the inverse probability of the moves picked so far: the sum of these weights is
+        an unbiased estimate of the number of nodes of the tree, and the weight of a complete path, if the
+        probe reaches one, an unbiased estimate of the number of solutions. The tree is the one searched by
+        `Solver.solve` (one search per (start, end) pair) or, with `per_pair=False`, by `Solver.count` and
+        `Solver.solve_by_end` (one search per start, any end); pairs rejected by the feasibility checks are
+        not part of it. The `n` limit of `solve` is not accounted for: the estimates are for a full search.
+
+        The search trees are very unbalanced, so the estimates have heavy tails: the confidence intervals
+        rely on the normal approximation, which such tails make unreliable (they may well miss the true value),
+        and tighten with the number of probes. When no probe reaches a solution, the number of solutions is
+        reported as unknown, with only a bound on the rate of the probes that would.
+    """
+
+    def __init__(self, board: Board, warnsdorf: bool = True, seed: Optional[int] = None, per_pair: bool = True):
+        """
+            :param board: The board of the search.
+            :param warnsdorf: Whether the search follows Warnsdorf's rule: probes then favour the moves it
+                tries first, which keeps the estimates unbiased but makes them converge faster on the paths
+                the search finds early.
+            :param seed: Optional seed of the random generator, for reproducible estimates.
+            :param per_pair: Whether to estimate the search of `solve`, one per (start, end) pair, rather than
+                the one of `count`, one per start.
+        """
+        self.board = Board(board.r, board.c, rule=board.rule)
+        self.warnsdorf = warnsdorf
+        self.per_pair = per_pair
+        self.random = random.Random(seed)
+        self.solver = Solver(Board(board.r, board.c, rule=board.rule), warnsdorf=warnsdorf)
+
+    def _roots(self, starting_point: Optional[Tuple[int, int]], ending_point: Optional[Tuple[int, int]]) -> List[Tuple[Tuple[int, int], Optional[Tuple[int, int]]]]:
+        """
+            Get the (start, end) pairs searched, each the root of a search tree; the end is None for any cell.
+        """
+        board = self.board
+        cells = [(r, c) for r in range(board.r) for c in range(board.c)]
+        starting_points = [starting_point] if starting_point else cells
+        if ending_point or not self.per_pair:
+            ending_points = [ending_point]
+        else:
+            ending_points = cells
+        self.solver.rejected = {}
+        return [(start, end) for start in starting_points for end in ending_points
+                if start != end and not self.solver._rejects(start, end)]
+
+    def _children(self, current: Tuple[int, int], end: Optional[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+            Get the moves the search tries from the current cell, as `Solver._backtrack` does.
+        """
+        board = self.board
+        moves = board.available_moves(current[0], current[1])
+        if end is not None and board.step == board.size():
+            moves = [move for move in moves if move == end]
+        return moves
+
+    def _pick(self, moves: List[Tuple[int, int]]) -> Tuple[Tuple[int, int], float]:
+        """
+            Pick a move at random, uniformly or favouring Warnsdorf's choices.
+
+            :return: The move and the probability it had to be picked.
+        """
+        if not self.warnsdorf or len(moves) == 1:
+            return self.random.choice(moves), 1 / len(moves)
+        weights = [1 / (1 + len(self.board.available_moves(move[0], move[1]))) for move in moves]
+        i = self.random.choices(range(len(moves)), weights=weights)[0]
+        return moves[i], weights[i] / sum(weights)
+
+    def probe(self, roots: List[Tuple[Tuple[int, int], Optional[Tuple[int, int]]]], depth: Optional[int] = None) -> Tuple[float, float, List[Tuple[int, int]], Optional[Tuple[int, int]]]:
+        """
+            Walk down the search tree along random moves.
+
+            :param roots: The (start, end) pairs searched, as returned by `_roots`.
+            :param depth: Optional number of moves after which to stop.
+            :return: The node and solution estimates of the probe, its path, and the end of its root.
+        """
+        board = self.board
+        start, end = self.random.choice(roots)
+        weight = float(len(roots))
+        nodes = weight
+        board.first_move(start)
+        path = [start]
+        while not board.is_complete() and (depth is None or len(path) <= depth):
+            moves = self._children(path[-1], end)
+            if not moves:
+                break
+            move, probability = self._pick(moves)
+            board.move(path[-1], move)
+            path.append(move)
+            weight /= probability
+            nodes += weight
+        solutions = weight if board.is_complete() else 0.0
+        board.clean()
+        return nodes, solutions, path, end
+
+    def _subtree_nodes(self, current: Tuple[int, int], end: Optional[Tuple[int, int]]) -> int:
+        """
+            Count exactly the nodes of the search below the current state of the board, the current one included.
+        """
+        board = self.board
+        if board.is_complete():
+            return 1
+        nodes = 1
+        for move in self._children(current, end):
+            board.move(current, move)
+            nodes += self._subtree_nodes(move, end)
+            board.unmove(move)
+        return nodes
+
+    def calibrate(self, roots: List[Tuple[Tuple[int, int], Optional[Tuple[int, int]]]], budget: float = 0.2, tail: int = 12) -> float:
+        """
+            Measure the time `Solver` spends per node, by searching small subtrees below random probes.
+
+            :param roots: The (start, end) pairs searched, as returned by `_roots`.
+            :param budget: The time to spend searching, in seconds.
+            :param tail: The number of cells left unvisited at the root of each subtree.
+            :return: The average time per node, in seconds.
+        """
+        board, solver = self.board, self.solver
+        depth = max(board.size() - 1 - tail, 0)
+        nodes, elapsed = 0, 0.0
+        while elapsed < budget:
+            _, _, path, end = self.probe(roots, depth=depth)
+            board.restore(path[:-1], path[-1])
+            subtree = self._subtree_nodes(path[-1], end)
+            board.clean()
+
+            solver.board.restore(path[:-1], path[-1])
+            start_time = time.perf_counter()
+            if self.per_pair:
+                solver._backtrack(path[-1], (end,), [], list(path), None)
+            else:
+                solver._count_backtrack(path[-1], None)
+            elapsed += time.perf_counter() - start_time
+            solver.board.clean()
+            nodes += subtree
+        return elapsed / nodes
+
+    def estimate(self, starting_point: Optional[Tuple[int, int]] = None, ending_point: Optional[Tuple[int, int]] = None,
+                 probes: int = 1000, confidence: float = 0.95, calibration: float = 0.2) -> Dict[str, Estimate]:
+        """
+            Estimate the size and the duration of a full search.
+
+            :param starting_point: Optional starting point as (row, col).
+            :param ending_point: Optional ending point as (row, col).
+            :param probes: The number of random probes.
+            :param confidence: The confidence level of the intervals.
+            :param calibration: The time spent measuring the speed of the search, in seconds (0 to skip it).
+            :return: The estimates of the number of nodes, of solutions and of seconds, by name.
+        """
+        if probes < 2:
+            raise ValueError("At least two probes are needed for a confidence interval.")
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        roots = self._roots(starting_point, ending_point)
+        if not roots or self.board.size() < 2:
+            zero = Estimate(0.0, 0.0, confidence)
+            return {"nodes": zero, "solutions": zero, "seconds": zero}
+
+        samples = [self.probe(roots)[:2] for _ in range(probes)]
+        estimates: Dict[str, Estimate] = {}
+        for name, values in zip(("nodes", "solutions"), zip(*samples)):
+            mean = sum(values) / probes
+            deviation = math.sqrt(sum((value - mean) ** 2 for value in values) / (probes - 1))
+            # every probe counts nodes, but only those reaching a solution count solutions
+            hits = sum(1 for value in values if value > 0) if name == "solutions" else None
+            estimates[name] = Estimate(mean, z * deviation / math.sqrt(probes), confidence, hits=hits, probes=probes)
+
+        seconds_per_node = self.calibrate(roots, budget=calibration) if calibration > 0 else 0.0
+        nodes = estimates["nodes"]
+        estimates["seconds"] = Estimate(nodes.value * seconds_per_node, nodes.error * seconds_per_node, confidence)
+        return estimates
+
+import unittest
+
+class TestSearchTreeEstimator(unittest.TestCase):
+    def _exact(self, board: Board, per_pair: bool) -> Tuple[int, int]:
+        # nodes and solutions of the full search, by exhaustive enumeration
+        estimator = SearchTreeEstimator(board, per_pair=per_pair)
+        nodes = 0
+        for start, end in estimator._roots(None, None):
+            estimator.board.first_move(start)
+            nodes += estimator._subtree_nodes(start, end)
+            estimator.board.clean()
+        solutions = len(Solver(Board(board.r, board.c)).solve()) if per_pair else Solver(Board(board.r, board.c)).count()
+        return nodes, solutions
+
+    def test_unbiased(self):
+        board = Board(4, 5)
+        for per_pair in (True, False):
+            nodes, solutions = self._exact(board, per_pair)
+            for warnsdorf in (True, False):
+                estimator = SearchTreeEstimator(board, warnsdorf=warnsdorf, seed=3, per_pair=per_pair)
+                estimates = estimator.estimate(probes=4000, confidence=0.999, calibration=0)
+                self.assertLess(abs(estimates["nodes"].value - nodes), 4 * estimates["nodes"].error + 1)
+                self.assertLess(abs(estimates["solutions"].value - solutions), 4 * estimates["solutions"].error + 1)
+                self.assertEqual(estimates["seconds"].value, 0)
+
+    def test_single_path_tree(self):
+        # on a line of cells, the only pair the checks keep from an end is the other end, with a single path
+        from src.diplomatico.moves import MoveRule
+        board = Board(1, 5, rule=MoveRule([(0, 1), (0, -1)]))
+        estimates = SearchTreeEstimator(board, seed=0).estimate(starting_point=(0, 0), probes=10, calibration=0)
+        self.assertEqual(estimates["solutions"].value, 1)
+        self.assertEqual(estimates["solutions"].error, 0)
+        self.assertEqual(estimates["nodes"].value, 5)
+
+    def test_no_hit(self):
+        # few probes of the 5x5 search from a corner reach one of its 552 paths: none with this seed
+        estimates = SearchTreeEstimator(Board(5, 5), seed=0).estimate(starting_point=(0, 0), probes=100, calibration=0)
+        solutions = estimates["solutions"]
+        self.assertEqual(solutions.hits, 0)
+        self.assertEqual(solutions.high, math.inf)
+        self.assertAlmostEqual(solutions.hit_rate_bound, 3 / 100, places=3)
+        self.assertIn("unknown", repr(solutions))
+        self.assertIsNone(estimates["nodes"].hits)
+        self.assertLess(estimates["nodes"].high, math.inf)
+
+    def test_rejected_pairs(self):
+        estimates = SearchTreeEstimator(Board(3, 5), seed=0).estimate(probes=10, calibration=0)
+        self.assertEqual(estimates["nodes"].value, 0)
+
+    def test_calibration(self):
+        estimates = SearchTreeEstimator(Board(5, 5), seed=1).estimate(starting_point=(0, 0), probes=50, calibration=0.05)
+        self.assertGreater(estimates["seconds"].value, 0)
+
+if __name__ == "__main__":
+    unittest.main()
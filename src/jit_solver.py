@@ -0,0 +1,232 @@
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.diplomatico.board import Board
+from src.diplomatico.frontier import _neighbor_array
+from src.solver import Solver, _PathSink
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _expand(neighbors: np.ndarray, end: int, warnsdorf: bool, path: np.ndarray, moves: np.ndarray,
+            counts: np.ndarray, choice: np.ndarray, visited: np.ndarray, degrees: np.ndarray, depth: int) -> None:
+    """
+        List the moves tried from the cell at the given depth of the path, as `Solver._backtrack` orders them.
+    """
+    size = neighbors.shape[0]
+    cell = path[depth]
+    count = 0
+    for slot in range(neighbors.shape[1]):
+        move = neighbors[cell, slot]
+        if move < 0:
+            break
+        if visited[move]:
+            continue
+        # the last move must reach the ending cell, if any
+        if end >= 0 and depth == size - 2 and move != end:
+            continue
+        moves[depth, count] = move
+        count += 1
+    if warnsdorf and count > 1:
+        # stable insertion sort by onward degree, as Warnsdorf's rule in `Solver`
+        for i in range(count):
+            degrees[i] = 0
+            for slot in range(neighbors.shape[1]):
+                onward = neighbors[moves[depth, i], slot]
+                if onward < 0:
+                    break
+                if not visited[onward]:
+                    degrees[i] += 1
+        for i in range(1, count):
+            move, degree = moves[depth, i], degrees[i]
+            j = i - 1
+            while j >= 0 and degrees[j] > degree:
+                moves[depth, j + 1], degrees[j + 1] = moves[depth, j], degrees[j]
+                j -= 1
+            moves[depth, j + 1], degrees[j + 1] = move, degree
+    counts[depth] = count
+    choice[depth] = 0
+
+def _search(neighbors: np.ndarray, end: int, warnsdorf: bool, path: np.ndarray, moves: np.ndarray,
+            counts: np.ndarray, choice: np.ndarray, visited: np.ndarray, degrees: np.ndarray, depth: int,
+            out: np.ndarray) -> Tuple[int, int]:
+    """
+        Depth-first search of the Hamiltonian paths over flat arrays, with an explicit stack so that it can
+        pause once the output buffer is full, and resume from the returned depth.
+
+        :param neighbors: The cell indices one move away from each cell, padded with -1.
+        :param end: The ending cell index, or -1 for any.
+        :param warnsdorf: Whether to try the moves by Warnsdorf's rule.
+        :param path: The cell indices of the current path, up to the depth.
+        :param moves: For each depth, the moves to try from the cell at that depth.
+        :param counts: For each depth, the number of moves to try.
+        :param choice: For each depth, the index of the next move to try.
+        :param visited: The occupancy of the board.
+        :param degrees: Scratch buffer for the onward degrees of the moves, as wide as the neighbor table.
+        :param depth: The depth of the current cell, -1 once the search is over.
+        :param out: The buffer receiving the paths found, one per row.
+        :return: The number of paths written to the buffer, and the depth to resume from.
+    """
+    size = neighbors.shape[0]
+    found = 0
+    while depth >= 0:
+        if depth == size - 1:
+            out[found, :] = path
+            found += 1
+            visited[path[depth]] = False
+            depth -= 1
+            if found == out.shape[0]:
+                break
+        elif choice[depth] < counts[depth]:
+            move = moves[depth, choice[depth]]
+            choice[depth] += 1
+            depth += 1
+            path[depth] = move
+            visited[move] = True
+            if depth < size - 1:
+                _expand(neighbors, end, warnsdorf, path, moves, counts, choice, visited, degrees, depth)
+        else:
+            visited[path[depth]] = False
+            depth -= 1
+    return found, depth
+
+_search_jit = None
+if njit is not None:
+    # compiled on first use, and cached on disk for the next runs; the kernel calls the compiled _expand
+    _expand = njit(cache=True)(_expand)
+    _search_jit = njit(cache=True)(_search)
+
+class JitSolver(Solver):
+    """
+        Solver whose Hamiltonian path search runs in a Numba-compiled kernel over flat integer arrays: a padded
+        neighbor table, the occupancy and a path buffer. It finds the same paths as `Solver.solve`, in the same
+        order; without Numba, it falls back to `Solver`. The other searches are inherited from `Solver`.
+    """
+
+    def __init__(self, board: Board, warnsdorf: bool = True, chunk: int = 1024):
+        """
+            :param board: The board to solve.
+            :param warnsdorf: Whether to use Warnsdorf's rule.
+            :param chunk: The number of paths the kernel hands back at once.
+        """
+        super().__init__(board, warnsdorf=warnsdorf)
+        self.chunk = chunk
+        self.neighbors = _neighbor_array(board.table)
+
+    @staticmethod
+    def available() -> bool:
+        """
+            Check whether Numba is installed, so that the kernel is compiled.
+        """
+        return njit is not None
+
+    def _paths(self, start: int, end: int, n: Optional[int], search: Callable = _search) -> Iterator[List[Tuple[int, int]]]:
+        """
+            Run the kernel from one start cell, handing back the paths chunk by chunk.
+
+            :param start: The starting cell index.
+            :param end: The ending cell index, or -1 for any.
+            :param n: The maximum number of paths to find (None for unlimited).
+            :param search: The kernel to run, compiled or not.
+            :return: An iterator over the paths, each a list of (row, col) tuples.
+        """
+        size, c = self.board.size(), self.board.c
+        path = np.zeros(size, dtype=np.int64)
+        moves = np.zeros((size, self.neighbors.shape[1]), dtype=np.int64)
+        counts = np.zeros(size, dtype=np.int64)
+        choice = np.zeros(size, dtype=np.int64)
+        visited = np.zeros(size, dtype=np.bool_)
+        degrees = np.zeros(self.neighbors.shape[1], dtype=np.int64)
+        path[0] = start
+        visited[start] = True
+        _expand(self.neighbors, end, self.warnsdorf, path, moves, counts, choice, visited, degrees, 0)
+        depth = 0
+        while depth >= 0 and (n is None or n > 0):
+            out = np.zeros((self.chunk if n is None else min(n, self.chunk), size), dtype=np.int64)
+            found, depth = search(self.neighbors, end, self.warnsdorf, path, moves, counts, choice, visited, degrees, depth, out)
+            if n is not None:
+                n -= found
+            for row in out[:found].tolist():
+                yield [divmod(i, c) for i in row]
+
+    def solve(self, starting_point: Optional[Tuple[int, int]] = None, ending_point: Optional[Tuple[int, int]] = None, n: Optional[int] = None, progress: bool = False,
+              on_path: Optional[Callable[[List[Tuple[int, int]]], None]] = None) -> List[List[Tuple[int, int]]]:
+        """
+            Solve the Hamiltonian path problem with the compiled kernel, as `Solver.solve` does.
+
+            :param starting_point: Optional starting point as (row, col).
+            :param ending_point: Optional ending point as (row, col).
+            :param n: The maximum number of paths to find (None for unlimited).
+            :param progress: Whether to show progress over the start cells.
+            :param on_path: Optional callback receiving each path as it is found; the paths are then not stored.
+            :return: A list of found Hamiltonian paths, each path is a list of (row, col) tuples (empty with on_path).
+        """
+        if not self.available():
+            return super().solve(starting_point, ending_point, n=n, progress=progress, on_path=on_path)
+        return self._solve(starting_point, ending_point, n=n, progress=progress, on_path=on_path, search=_search_jit)
+
+    def _solve(self, starting_point: Optional[Tuple[int, int]], ending_point: Optional[Tuple[int, int]], n: Optional[int], progress: bool,
+               on_path: Optional[Callable[[List[Tuple[int, int]]], None]], search: Callable) -> List[List[Tuple[int, int]]]:
+        """
+            Search the (start, end) pairs in the order of `Solver.solve`, running the given kernel on each.
+        """
+        board = self.board
+        starting_points = [starting_point] if starting_point else [(r, c) for r in range(board.r) for c in range(board.c)]
+        ending_points = [ending_point] if ending_point else [(r, c) for r in range(board.r) for c in range(board.c)]
+        if progress:
+            from tqdm import tqdm
+            starting_points = tqdm(starting_points, desc="Start Nodes")
+        paths: List[List[Tuple[int, int]]] = [] if on_path is None else _PathSink(on_path)  # type: ignore
+        self.rejected = {}
+        if board.size() < 2:
+            return []
+
+        for start in starting_points:
+            for end in ending_points:
+                if start == end or self._rejects(start, end):
+                    continue
+                limit = None if n is None else n - len(paths)
+                for path in self._paths(start[0] * board.c + start[1], end[0] * board.c + end[1], limit, search):
+                    paths.append(path)
+                if n is not None and len(paths) >= n:
+                    return paths if on_path is None else []
+        return paths if on_path is None else []
+
+import unittest
+
+class TestJitSolver(unittest.TestCase):
+    # the kernel is tested uncompiled, so that the tests do not depend on Numba
+    def _solve(self, solver: JitSolver, **kwargs) -> List[List[Tuple[int, int]]]:
+        return solver._solve(kwargs.get("starting_point"), kwargs.get("ending_point"), n=kwargs.get("n"),
+                             progress=False, on_path=kwargs.get("on_path"), search=_search)
+
+    def test_matches_solver(self):
+        from src.diplomatico.moves import KNIGHT
+        for r, c, rule in [(4, 5, None), (3, 4, KNIGHT)]:
+            for warnsdorf in (True, False):
+                board = Board(r, c) if rule is None else Board(r, c, rule=rule)
+                expected = Solver(Board(r, c, rule=board.rule), warnsdorf=warnsdorf).solve()
+                self.assertEqual(self._solve(JitSolver(board, warnsdorf=warnsdorf)), expected)
+
+    def test_anchors_and_limit(self):
+        board = Board(4, 5)
+        solver = Solver(Board(4, 5))
+        for kwargs in [{"starting_point": (0, 0)}, {"starting_point": (1, 1), "ending_point": (2, 4)},
+                       {"n": 3}, {"starting_point": (0, 0), "n": 1}]:
+            self.assertEqual(self._solve(JitSolver(board, chunk=2), **kwargs), solver.solve(**kwargs), kwargs)
+
+    def test_on_path(self):
+        seen = []
+        result = self._solve(JitSolver(Board(4, 5)), starting_point=(0, 0), on_path=seen.append)
+        self.assertEqual(result, [])
+        self.assertEqual(seen, Solver(Board(4, 5)).solve(starting_point=(0, 0)))
+
+    def test_fallback(self):
+        # with or without Numba, the public entry point finds the paths of Solver
+        self.assertEqual(JitSolver(Board(4, 5)).solve(n=5), Solver(Board(4, 5)).solve(n=5))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
+
+from neo4j import AsyncGraphDatabase
+from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+
+from src.diplomatico.graph import BoardGraph
+from src.diplomatico.board import Board
+from src.neo4j_connection import DiplomaticoQueries, QueryType
+
+async def gather_bounded(awaitables: Iterable[Awaitable[Any]], limit: int, progress: Optional[str] = None) -> List[Any]:
+    """
+        Await the given awaitables with at most `limit` of them in flight at once.
+
+        :param awaitables: The awaitables to run.
+        :param limit: The maximum number of awaitables running concurrently.
+        :param progress: Optional description of a progress bar over the completed awaitables.
+        :return: The results, in the order of the awaitables.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(awaitable: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await awaitable
+
+    tasks = [asyncio.ensure_future(bounded(awaitable)) for awaitable in awaitables]
+    if progress:
+        from tqdm import tqdm
+        for future in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc=progress):
+            await future
+    return list(await asyncio.gather(*tasks))
+
+class AsyncNeo4JConnectionDiplomatico(DiplomaticoQueries):
+    """
+        Asynchronous Neo4J connection for the Diplomatico application, for running many independent
+        read queries on an existing board graph concurrently.
+        Graph creation and centrality writes stay with `Neo4JConnectionDiplomatico`.
+    """
+    def __init__(self, board_graph: BoardGraph, max_concurrency: int = 8):
+        """
+            :param board_graph: The board graph already stored in the database.
+            :param max_concurrency: The maximum number of queries in flight at once.
+        """
+        self.board_graph = board_graph
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # whether APOC is installed, checked once per connection
+        self._apoc_installed: Optional[bool] = None
+        self._apoc_lock = asyncio.Lock()
+        self.driver = AsyncGraphDatabase.driver(
+            NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD),
+            max_connection_pool_size=max(max_concurrency, 1)
+        )
+
+    async def __aenter__(self) -> "AsyncNeo4JConnectionDiplomatico":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+            Close the underlying driver and its connections.
+        """
+        await self.driver.close()
+
+    async def run_query(self, query: str, parameters: Optional[Dict] = None) -> List[Dict]:
+        """
+            Run a Cypher query against the Neo4j database, waiting for a free slot if too many are in flight.
+
+            :param query: The Cypher query to run.
+            :param parameters: Optional parameters for the query.
+            :return: The records of the result, as dictionaries of graph objects.
+        """
+        async with self.semaphore:
+            async with self.driver.session() as session:
+                result = await session.run(query, parameters)
+                return [dict(record.items()) async for record in result]
+
+    async def is_apoc_installed(self) -> bool:
+        """
+            Check if APOC is installed in the Neo4j database; the database is only asked once per connection,
+            even by concurrent queries.
+        """
+        async with self._apoc_lock:
+            if self._apoc_installed is None:
+                try:
+                    result = await self.run_query("CALL apoc.help('') YIELD name RETURN name LIMIT 1")
+                    self._apoc_installed = bool(result)
+                except Exception:
+                    self._apoc_installed = False
+        return self._apoc_installed
+
+    async def hamiltonian_paths(self, query_type: QueryType = QueryType.RAW,
+                                n: Optional[int] = 1, starting_node: Optional[Tuple[int, int]] = None,
+                                ending_node: Optional[Tuple[int, int]] = None, warnsdorf: bool = True) -> List:
+        """
+            Calculate the Hamiltonian paths of the current board.
+
+            :param query_type: The type of algorithm to run; PYTHON and JIT run in a worker thread on their own board.
+            :param n: The number of paths to return.
+            :param starting_node: Optional starting node as (row, col).
+            :param ending_node: Optional ending node as (row, col).
+            :param warnsdorf: Whether to use Warnsdorf's rule (only for PYTHON, JIT and INCREMENTAL query types).
+            :return: The Hamiltonian paths; impossible anchors return none, with the reason in `last_rejection`.
+        """
+        if self.reject(starting_node, ending_node):
+            return []
+        if query_type in (QueryType.PYTHON, QueryType.JIT):
+            board = self.board_graph.board
+            solver = self.solver(query_type, Board(board.r, board.c, rule=board.rule), warnsdorf=warnsdorf)
+            return await asyncio.to_thread(solver.solve, starting_point=starting_node, ending_point=ending_node, n=n)
+        if query_type == QueryType.APOC and not await self.is_apoc_installed():
+            raise RuntimeError("APOC is not installed.")
+
+        query, parameters = self.hamiltonian_query(query_type, n=n, starting_node=starting_node, ending_node=ending_node, warnsdorf=warnsdorf)
+        result = await self.run_query(query, parameters)
+        return self.parse_path(result)
+
+    async def path_count_row(self, query_type: QueryType, starting_node: Tuple[int, int]) -> List[int]:
+        """
+            Count the Hamiltonian paths from a start cell towards every end cell, with a single query.
+
+            :param query_type: The type of algorithm to run.
+            :param starting_node: The starting node as (row, col).
+            :return: For each cell index (row * c + col), the number of paths ending there.
+        """
+        c = self.board_graph.board.c
+        row = [0] * self.board_graph.board.size()
+        for path in await self.hamiltonian_paths(query_type=query_type, n=None, starting_node=starting_node):
+            row[path[-1][0] * c + path[-1][1]] += 1
+        return row
+
+    async def path_count_matrix(self, query_type: QueryType = QueryType.APOC,
+                                starting_nodes: Optional[List[Tuple[int, int]]] = None,
+                                progress: Optional[str] = None) -> List[List[int]]:
+        """
+            Count the Hamiltonian paths between every pair of cells, with the per-start queries in flight at once,
+            as many as the connection allows; PYTHON and JIT count every start in a single worker thread instead.
+
+            :param query_type: The type of algorithm to run.
+            :param starting_nodes: Optional start cells as (row, col) to count the paths of (None for all).
+            :param progress: Optional description of a progress bar over the start cells.
+            :return: The N x N matrix whose entry [i][j] counts the paths from cell index i to cell index j
+                (row * c + col); the rows of the other start cells are zero.
+        """
+        board = self.board_graph.board
+        if query_type in (QueryType.PYTHON, QueryType.JIT):
+            solver = self.solver(query_type, Board(board.r, board.c, rule=board.rule))
+            return await asyncio.to_thread(solver.count_matrix, starting_points=starting_nodes)
+
+        if starting_nodes is None:
+            starting_nodes = [(i, j) for i in range(board.r) for j in range(board.c)]
+        rows = await gather_bounded([self.path_count_row(query_type, start) for start in starting_nodes],
+                                    limit=self.max_concurrency, progress=progress)
+        matrix = [[0] * board.size() for _ in range(board.size())]
+        for (i, j), row in zip(starting_nodes, rows):
+            matrix[i * board.c + j] = row
+        return matrix
+
+    async def node_centrality(self, i: int, j: int, centralities: List[str] = ["degree"]) -> Dict:
+        """
+            Read the centrality measures of a node at position (i, j); they must have been written beforehand
+            with `Neo4JConnectionDiplomatico.write_centralities`.
+        """
+        if not self.board_graph.board.is_valid_cell(i, j):
+            raise ValueError(f"Invalid node position: ({i}, {j})")
+        query, parameters = self.centrality_query(i, j, centralities)
+        result = await self.run_query(query, parameters)
+        return result[0] if result else {}
@@ -1,28 +1,15 @@
+import hashlib
+
 from py2neo import Graph
 from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
-from enum import Enum
-from typing import List, Tuple, Dict, Optional
+from typing import Callable, Iterable, Iterator, List, Tuple, Dict, Optional, Union
 
 from src.diplomatico.graph import BoardGraph
 from src.diplomatico.board import Board
+from src.diplomatico.moves import MoveRule, DIPLOMATICO
+from src.query_type import QueryType
 from src.solver import Solver
 
-class QueryType(Enum):
-    """
-        Enum for the type of query to run.
-    """
-    RAW = "RAW"
-    CONSTRUCTIVE = "CONSTRUCTIVE"
-    APOC = "APOC"
-    PYTHON = "PYTHON"
-
-    @staticmethod
-    def from_str(val: str):
-        for query_type in QueryType:
-            if query_type.name == val.upper():
-                return query_type
-        raise ValueError(f"Unknown QueryType: {val}")
-
 class Neo4JConnection:
     """
         Base class for Neo4J connection and utility methods.
@@ -30,19 +17,20 @@ class Neo4JConnection:
     """
     def __init__(self):
         self.graph = Graph(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        # whether APOC is installed, checked once per connection
+        self._apoc_installed: Optional[bool] = None
 
     def is_apoc_installed(self) -> bool:
         """
-            Check if APOC is installed in the Neo4j database.
+            Check if APOC is installed in the Neo4j database; the database is only asked once per connection.
         """
-        try:
-            result = self.graph.run("CALL apoc.help('') YIELD name RETURN name LIMIT 1").data()
-            if result:
-                return True
-            else:
-                return False
-        except Exception as e:
-            return False
+        if self._apoc_installed is None:
+            try:
+                result = self.graph.run("CALL apoc.help('') YIELD name RETURN name LIMIT 1").data()
+                self._apoc_installed = bool(result)
+            except Exception as e:
+                self._apoc_installed = False
+        return self._apoc_installed
         
     def is_gds_installed(self) -> bool:
         """
@@ -77,12 +65,13 @@ class Neo4JConnection:
                 """
         self.run_query(query)
 
-    def create_projection(self, create_query: str, graph_name: str = "myGraph") -> None:
+    def create_projection(self, create_query: str, graph_name: str = "myGraph", parameters: Optional[Dict] = None) -> None:
         """
             Create a graph projection in the Neo4j database; it the projection already exists, it will be dropped first.
 
             :param query: The Cypher query to create the projection.
             :param graph_name: The name of the graph projection.
+            :param parameters: Optional parameters for the query.
         """
         if not self.is_gds_installed():
             raise RuntimeError("GDS is not installed.")
@@ -91,9 +80,9 @@ class Neo4JConnection:
         if result and result[0]['exists']:
             drop_query = f"CALL gds.graph.drop('{graph_name}');"
             self.run_query(drop_query)
-            self.run_query(create_query)
+            self.run_query(create_query, parameters)
         else:
-            self.run_query(create_query)
+            self.run_query(create_query, parameters)
 
     def get_property(self, attributes: Dict, property: str):
         """
@@ -103,12 +92,12 @@ class Neo4JConnection:
             :param property: The property to retrieve.
             :return: The value of the property, or None if not found.
         """
-        attr_str = ", ".join([f"{key}: {value}" for key, value in attributes.items()])
+        attr_str = ", ".join([f"{key}: ${key}" for key in attributes])
         query = f"""MATCH (n:Node {{{attr_str}}})
                     RETURN n.{property} AS {property}
                     LIMIT 1
                 """
-        result = self.run_query(query)
+        result = self.run_query(query, attributes)
         if result and property in result[0]:
             return result[0][property]
         return None
@@ -125,47 +114,60 @@ class Neo4JConnection:
             raise RuntimeError("Neo4j server is not running.")
         return self.graph.run(query, parameters).data()
 
-class Neo4JConnectionDiplomatico(Neo4JConnection):
+    def stream_query(self, query, parameters=None) -> Iterator[Dict]:
+        """
+            Run a Cypher query against the Neo4j database, yielding the records one at a time as they arrive.
+
+            :param query: The Cypher query to run.
+            :param parameters: Optional parameters for the query.
+            :return: An iterator over the records, as dictionaries.
+        """
+        if not self.is_server_running():
+            raise RuntimeError("Neo4j server is not running.")
+        for record in self.graph.run(query, parameters):
+            yield dict(record)
+
+class DiplomaticoQueries:
     """
-        Neo4J connection class specific to the Diplomatico application.
+        Query building and result parsing shared by the synchronous and asynchronous Diplomatico connections.
     """
-    def __init__(self):
-        super().__init__()
+    board_graph: BoardGraph
+    last_rejection: Optional[str] = None
 
-        self.board_graph: BoardGraph = BoardGraph(Board(1, 1))
-
-    def create_graph_query(self, r: int, c: int):
+    @property
+    def board_id(self) -> str:
         """
-            Create a board graph with the given number of rows and columns.
-
-            :param r: The number of rows.
-            :param c: The number of columns.
+            Get the identifier scoping the nodes of the current board, stored in their indexed `board` property,
+            so that several boards can live side by side in one database. It ends with a hash of the move offsets,
+            since rules sharing a name (e.g. the default one of ad hoc rules) may have different move graphs.
         """
-        query = ""
-        for i in range(r):
-            for j in range(c):
-                query += f"CREATE (n_{i}_{j}:Node {{row: {i}, col: {j}}})\n"
-        self.board_graph = BoardGraph(Board(r, c))
-        adjacency_matrix = self.board_graph.adjacency_matrix
-        for i in range(len(adjacency_matrix)):
-            for j in range(len(adjacency_matrix[i])):
-                if adjacency_matrix[i][j] == 1:
-                    query += f"CREATE (n_{i // c}_{i % c})-[:MOVE]->(n_{j // c}_{j % c})\n"
-        self.run_query(query)
+        board = self.board_graph.board
+        offsets = hashlib.blake2b(repr(sorted(board.rule.offsets)).encode(), digest_size=4).hexdigest()
+        return f"{board.rule.name}_{board.r}x{board.c}_{offsets}"
 
-    def hamiltonian_paths(self, query_type: QueryType = QueryType.RAW, 
-                          n: Optional[int] = 1, starting_node: Optional[Tuple[int, int]] = None, 
-                          ending_node: Optional[Tuple[int, int]] = None, progress: bool = False, warnsdorf: bool = True) -> List:
+    @staticmethod
+    def solver(query_type: QueryType, board: Board, warnsdorf: bool = True) -> Solver:
         """
-            Calculate the Hamiltonian paths' number for the current board.
+            Get the in-process solver of a query type: `Solver` for PYTHON, or the compiled `JitSolver` for JIT.
+        """
+        if query_type == QueryType.JIT:
+            from src.jit_solver import JitSolver
+            return JitSolver(board, warnsdorf=warnsdorf)
+        return Solver(board, warnsdorf=warnsdorf)
+
+    def hamiltonian_query(self, query_type: QueryType, n: Optional[int] = 1,
+                          starting_node: Optional[Tuple[int, int]] = None,
+                          ending_node: Optional[Tuple[int, int]] = None,
+                          warnsdorf: bool = True) -> Tuple[str, Dict]:
+        """
+            Build the Cypher query computing the Hamiltonian paths of the current board.
 
-            :param query_type: The type of algorithm to run.
+            :param query_type: The type of algorithm to run; PYTHON has no query.
             :param n: The number of paths to return.
             :param starting_node: Optional starting node as (row, col).
             :param ending_node: Optional ending node as (row, col).
-            :param progress: Whether to show progress (only for PYTHON query type).
-            :param warnsdorf: Whether to use Warnsdorf's rule (only for PYTHON query type).
-            :return: The Hamiltonian paths.
+            :param warnsdorf: Whether to order each hop by Warnsdorf's rule (only for INCREMENTAL query type).
+            :return: The query and its parameters.
         """
         query = ""
         parameters = {}
@@ -177,14 +179,18 @@ class Neo4JConnectionDiplomatico(Neo4JConnection):
                 if not self.board_graph.board.is_valid_cell(row, col):
                     raise ValueError(f"Invalid starting node: ({row}, {col})")
                 query += f"""
-                            MATCH (start:Node {{row: {row}, col: {col}}})
+                            MATCH (start:Node {{board: $board, row: {row}, col: {col}}})
+                        """
+            else:
+                query += """
+                            MATCH (start:Node {board: $board})
                         """
             if ending_node is not None:
                 row, col = ending_node
                 if not self.board_graph.board.is_valid_cell(row, col):
                     raise ValueError(f"Invalid ending node: ({row}, {col})")
                 query += f"""
-                                MATCH (end:Node {{row: {row}, col: {col}}})
+                                MATCH (end:Node {{board: $board, row: {row}, col: {col}}})
                         """
                 
             query += f'''
@@ -199,7 +205,7 @@ class Neo4JConnectionDiplomatico(Neo4JConnection):
             if path_length < 0:
                 raise ValueError("Board size must be >= 1")
             if path_length == 0:
-                query = "MATCH (n:Node) RETURN [n] AS p"
+                query = "MATCH (n:Node {board: $board}) RETURN [n] AS p"
                 parameters = {}
             else:
                 # build node variable names including n0 .. n{L}
@@ -211,12 +217,14 @@ class Neo4JConnectionDiplomatico(Neo4JConnection):
                     row, col = starting_node
                     if not self.board_graph.board.is_valid_cell(row, col):
                         raise ValueError(f"Invalid starting node: ({row}, {col})")
-                    prefix += f"MATCH (n0:Node {{row: {row}, col: {col}}})\n"
+                    prefix += f"MATCH (n0:Node {{board: $board, row: {row}, col: {col}}})\n"
+                else:
+                    prefix += "MATCH (n0:Node {board: $board})\n"
                 if ending_node is not None:
                     row, col = ending_node
                     if not self.board_graph.board.is_valid_cell(row, col):
                         raise ValueError(f"Invalid ending node: ({row}, {col})")
-                    prefix += f"MATCH (n{path_length}:Node {{row: {row}, col: {col}}})\n"
+                    prefix += f"MATCH (n{path_length}:Node {{board: $board, row: {row}, col: {col}}})\n"
 
                 # Build chained pattern starting from n0
                 pattern = "MATCH p = (" + node_vars[0] + ":Node)"
@@ -242,23 +250,21 @@ class Neo4JConnectionDiplomatico(Neo4JConnection):
                 parameters = {}
 
         elif query_type == QueryType.APOC:
-            if not self.is_apoc_installed():
-                raise RuntimeError("APOC is not installed.")
             # Prepare MATCH bindings for start and optional end
             prefix = ""
             if starting_node is not None:
                 row, col = starting_node
                 if not self.board_graph.board.is_valid_cell(row, col):
                     raise ValueError(f"Invalid starting node: ({row}, {col})")
-                prefix += f"MATCH (start:Node {{row: {row}, col: {col}}})\n"
+                prefix += f"MATCH (start:Node {{board: $board, row: {row}, col: {col}}})\n"
             else:
-                prefix += "MATCH (start:Node)\n"
+                prefix += "MATCH (start:Node {board: $board})\n"
 
             if ending_node is not None:
                 row, col = ending_node
                 if not self.board_graph.board.is_valid_cell(row, col):
                     raise ValueError(f"Invalid ending node: ({row}, {col})")
-                prefix += f"MATCH (end:Node {{row: {row}, col: {col}}})\n"
+                prefix += f"MATCH (end:Node {{board: $board, row: {row}, col: {col}}})\n"
 
             config_items = [
                 "relationshipFilter: 'MOVE>'",
@@ -283,14 +289,90 @@ class Neo4JConnectionDiplomatico(Neo4JConnection):
                     """
             parameters = {"pathLength": self.board_graph.board.size() - 1}
 
-        elif query_type == QueryType.PYTHON:
-            solver = Solver(self.board_graph.board, warnsdorf=warnsdorf)
-            paths = solver.solve(starting_point=starting_node, ending_point=ending_node, n=n, progress=progress)
-            return paths
+        elif query_type == QueryType.INCREMENTAL:
+            path_length = self.board_graph.board.size() - 1
+
+            if starting_node is not None:
+                row, col = starting_node
+                if not self.board_graph.board.is_valid_cell(row, col):
+                    raise ValueError(f"Invalid starting node: ({row}, {col})")
+                query += f"MATCH (start:Node {{board: $board, row: {row}, col: {col}}})\n"
+            else:
+                query += "MATCH (start:Node {board: $board})\n"
+            carried = "path"
+            if ending_node is not None:
+                row, col = ending_node
+                if not self.board_graph.board.is_valid_cell(row, col):
+                    raise ValueError(f"Invalid ending node: ({row}, {col})")
+                query += f"MATCH (end:Node {{board: $board, row: {row}, col: {col}}})\n"
+                query += "WHERE start <> end\n"
+                carried = "path, end"
+            query += f"WITH [start] AS {carried}\n"
+
+            # extend every path by one hop per stage, so the query grows linearly with the path length
+            for step in range(1, path_length + 1):
+                last_step = step == path_length
+                conditions = ["NOT next IN path"]
+                if ending_node is not None:
+                    conditions.append("next = end" if last_step else "next <> end")
+                where = " AND ".join(conditions)
+                if warnsdorf and not last_step:
+                    # per-path Warnsdorf ordering; dead ends are pruned, as the next hop could not continue
+                    query += (
+                        "CALL {\n"
+                        f"  WITH {carried}\n"
+                        f"  WITH {carried}, last(path) AS cur\n"
+                        "  MATCH (cur)-[:MOVE]->(next:Node)\n"
+                        f"  WHERE {where}\n"
+                        "  WITH next, COUNT { (next)-[:MOVE]->(m:Node) WHERE NOT m IN path } AS degree\n"
+                        "  WHERE degree > 0\n"
+                        "  RETURN next ORDER BY degree\n"
+                        "}\n"
+                    )
+                else:
+                    query += (
+                        f"WITH {carried}, last(path) AS cur\n"
+                        "MATCH (cur)-[:MOVE]->(next:Node)\n"
+                        f"WHERE {where}\n"
+                    )
+                query += f"WITH path + next AS {carried}\n"
+            query += "RETURN path AS p\n"
+            parameters = {}
+
+        else:
+            raise ValueError(f"No Cypher query for QueryType: {query_type}")
 
         query += f"LIMIT {n}" if n else ""
-        result = self.run_query(query=query, parameters=parameters)
-        return self.parse_path(result)
+        # nodes of other boards are never matched: starts are scoped, and moves never leave a board
+        parameters["board"] = self.board_id
+        return query, parameters
+
+    def reject(self, starting_node: Optional[Tuple[int, int]], ending_node: Optional[Tuple[int, int]]) -> Optional[str]:
+        """
+            Check the anchors against cheap necessary conditions before dispatching a search, recording the reason
+            of a rejection in `last_rejection`.
+
+            :return: Why no Hamiltonian path can join the anchors, or None if the search should run.
+        """
+        self.last_rejection = self.board_graph.feasibility.check(starting_node, ending_node)
+        return self.last_rejection
+
+    def centrality_query(self, i: int, j: int, centralities: List[str]) -> Tuple[str, Dict]:
+        """
+            Build the Cypher query reading the centrality measures of the node at position (i, j).
+
+            :param i: The row of the node.
+            :param j: The column of the node.
+            :param centralities: The centrality properties to read.
+            :return: The query and its parameters.
+        """
+        query = f"""
+                    MATCH (n:Node {{board: $board, row: {i}, col: {j}}})
+                    RETURN
+                """
+        for centrality in centralities:
+            query += f"n.{centrality} AS {centrality},\n"
+        return query.rstrip(",\n") + "\n", {"board": self.board_id}
 
     def parse_path(self, result: List[Dict]) -> List[Tuple[int, int]]:
         """
@@ -344,58 +426,325 @@ class Neo4JConnectionDiplomatico(Neo4JConnection):
                 node_coords.append((row, col))
             paths.append(node_coords)
         return paths
-    
-    def node_centrality(self, i: int, j: int, centralities: List[str] = ["degree"]) -> Dict:
+
+class Neo4JConnectionDiplomatico(Neo4JConnection, DiplomaticoQueries):
+    """
+        Neo4J connection class specific to the Diplomatico application.
+    """
+    def __init__(self):
+        super().__init__()
+
+        self.board_graph: BoardGraph = BoardGraph(Board(1, 1))
+
+    def clean_graph(self, all_boards: bool = False) -> None:
         """
-            Calculate the centrality measures of a node at position (i, j), including degree, closeness, and betweenness.
+            Remove the nodes, relationships and exported solutions of the current board, leaving other boards untouched.
+
+            :param all_boards: Whether to clean the whole database instead.
+        """
+        if all_boards:
+            super().clean_graph()
+            return
+        parameters = {"board": self.board_id}
+        self.run_query("MATCH (s:Solution {board: $board}) DETACH DELETE s", parameters)
+        self.run_query("MATCH (n:Node {board: $board}) DETACH DELETE n", parameters)
+
+    def create_board_indexes(self) -> None:
+        """
+            Create the indexes scoping the board cells by board, and looking them up by position; each position
+            is unique per board, so that concurrent jobs merging the same board cannot create a cell twice.
         """
+        self.run_query("CREATE INDEX node_board IF NOT EXISTS FOR (n:Node) ON (n.board)")
+        self.run_query("CREATE CONSTRAINT node_board_row_col IF NOT EXISTS FOR (n:Node) REQUIRE (n.board, n.row, n.col) IS UNIQUE")
 
-        if not self.board_graph.board.is_valid_cell(i, j):
-            raise ValueError(f"Invalid node position: ({i}, {j})")
-        if not self.is_gds_installed():
-            raise RuntimeError("GDS is not installed.")
+    def create_graph_query(self, r: int, c: int, rule: MoveRule = DIPLOMATICO, reuse: bool = True):
+        """
+            Create a board graph with the given number of rows and columns, scoped to its own board identifier.
+            Nodes and moves are merged rather than created, so that jobs sharing the database can (re)create
+            the same board safely, and complete a board whose creation was interrupted.
 
-        # create projection
-    
-        query = f"""
-                    CALL gds.graph.project(
-                        'myGraph',
-                        'Node',
-                        'MOVE'
-                    );
+            :param r: The number of rows.
+            :param c: The number of columns.
+            :param rule: The move rule of the game.
+            :param reuse: Whether to keep the board graph if it is already stored in full, instead of recreating it.
+        """
+        self.board_graph = BoardGraph(Board(r, c, rule=rule))
+        self.create_board_indexes()
+        parameters = {"board": self.board_id}
+        if reuse:
+            # both the cells and the moves must all be stored, or the missing ones are merged below
+            result = self.run_query("""
+                        MATCH (n:Node {board: $board})
+                        RETURN count(n) AS nodes, sum(COUNT { (n)-[:MOVE]->() }) AS moves
+                    """, parameters)
+            moves = sum(len(targets) for targets in self.board_graph.neighbors)
+            if result and result[0]["nodes"] == r * c and result[0]["moves"] == moves:
+                return
+        else:
+            self.clean_graph()
+
+        cells = [[i, j] for i in range(r) for j in range(c)]
+        self.run_query("""
+                        UNWIND $cells AS cell
+                        MERGE (:Node {board: $board, row: cell[0], col: cell[1]})
+                    """, {**parameters, "cells": cells})
+        moves = [cells[i] + cells[j] for i, targets in enumerate(self.board_graph.neighbors) for j in targets]
+        self.run_query("""
+                        UNWIND $moves AS move
+                        MATCH (a:Node {board: $board, row: move[0], col: move[1]})
+                        MATCH (b:Node {board: $board, row: move[2], col: move[3]})
+                        MERGE (a)-[:MOVE]->(b)
+                    """, {**parameters, "moves": moves})
+
+    def hamiltonian_paths(self, query_type: QueryType = QueryType.RAW, 
+                          n: Optional[int] = 1, starting_node: Optional[Tuple[int, int]] = None, 
+                          ending_node: Optional[Tuple[int, int]] = None, progress: bool = False, warnsdorf: bool = True,
+                          on_path: Optional[Callable[[List[Tuple[int, int]]], None]] = None,
+                          group_by_end: bool = False) -> Union[List, Dict]:
+        """
+            Calculate the Hamiltonian paths' number for the current board.
+
+            :param query_type: The type of algorithm to run.
+            :param n: The number of paths to return.
+            :param starting_node: Optional starting node as (row, col).
+            :param ending_node: Optional ending node as (row, col).
+            :param progress: Whether to show progress (only for PYTHON query type).
+            :param warnsdorf: Whether to use Warnsdorf's rule (only for PYTHON, JIT and INCREMENTAL query types).
+            :param on_path: Optional callback receiving each path as it is found or streamed from the database;
+                the paths are then not stored.
+            :param group_by_end: Whether to group the paths by their final cell; the PYTHON query type then runs
+                a single search per start cell instead of one per (start, end) pair.
+            :return: The Hamiltonian paths (empty with on_path), or a dictionary mapping each final cell to its paths.
+                Impossible anchors return no paths, with the reason in `last_rejection`.
+        """
+        if self.reject(starting_node, ending_node):
+            return {} if group_by_end else []
+        if query_type in (QueryType.PYTHON, QueryType.JIT):
+            solver = self.solver(query_type, self.board_graph.board, warnsdorf=warnsdorf)
+            if group_by_end and ending_node is None and on_path is None:
+                return solver.solve_by_end(starting_point=starting_node, n=n, progress=progress)
+            paths = solver.solve(starting_point=starting_node, ending_point=ending_node, n=n, progress=progress, on_path=on_path)
+            return Solver.group_by_end(paths) if group_by_end else paths
+        if query_type == QueryType.APOC and not self.is_apoc_installed():
+            raise RuntimeError("APOC is not installed.")
+
+        query, parameters = self.hamiltonian_query(query_type, n=n, starting_node=starting_node, ending_node=ending_node, warnsdorf=warnsdorf)
+        if on_path is not None:
+            for record in self.stream_query(query=query, parameters=parameters):
+                for path in self.parse_path([record]):
+                    on_path(path)
+            return []
+        result = self.run_query(query=query, parameters=parameters)
+        paths = self.parse_path(result)
+        return Solver.group_by_end(paths) if group_by_end else paths
+
+    def path_count_matrix(self, query_type: QueryType = QueryType.PYTHON,
+                          starting_nodes: Optional[List[Tuple[int, int]]] = None) -> List[List[int]]:
+        """
+            Count the Hamiltonian paths between every pair of cells, bucketing each path by its final cell
+            as it is found or streamed, with a single search per start cell. PYTHON and JIT count in process;
+            the other query types stream one query per start cell after another, which
+            `AsyncNeo4JConnectionDiplomatico.path_count_matrix` runs concurrently instead.
+
+            :param query_type: The type of algorithm to run.
+            :param starting_nodes: Optional start cells as (row, col) to count the paths of (None for all).
+            :return: The N x N matrix whose entry [i][j] counts the paths from cell index i to cell index j
+                (row * c + col); the rows of the other start cells are zero.
+        """
+        board = self.board_graph.board
+        if query_type in (QueryType.PYTHON, QueryType.JIT):
+            return self.solver(query_type, board).count_matrix(starting_points=starting_nodes)
+
+        size = board.size()
+        matrix = [[0] * size for _ in range(size)]
+
+        def count(path: List[Tuple[int, int]]) -> None:
+            matrix[path[0][0] * board.c + path[0][1]][path[-1][0] * board.c + path[-1][1]] += 1
+
+        for start in starting_nodes if starting_nodes is not None else [None]:
+            self.hamiltonian_paths(query_type=query_type, n=None, starting_node=start, on_path=count)
+        return matrix
+
+    def hamiltonian_cycles(self, query_type: QueryType = QueryType.APOC, n: Optional[int] = None,
+                           progress: bool = False, warnsdorf: bool = True) -> List:
+        """
+            Calculate the Hamiltonian cycles of the current board, with the start fixed to the canonical cell (0, 0).
+            Each cycle is returned once; open paths from any other start can be derived with `Solver.rotate_cycle`.
+
+            :param query_type: The type of algorithm to run; only APOC and PYTHON are supported.
+            :param n: The number of cycles to return.
+            :param progress: Whether to show progress (only for PYTHON query type).
+            :param warnsdorf: Whether to use Warnsdorf's rule (only for PYTHON query type).
+            :return: The Hamiltonian cycles.
+        """
+        if query_type == QueryType.PYTHON:
+            solver = Solver(self.board_graph.board, warnsdorf=warnsdorf)
+            return solver.solve_cycles(n=n, progress=progress)
+        if query_type != QueryType.APOC:
+            raise ValueError(f"Unsupported QueryType for cycles: {query_type}")
+        if not self.is_apoc_installed():
+            raise RuntimeError("APOC is not installed.")
+        if self.board_graph.board.size() < 3:
+            return []
+
+        # the last node must move back to the start, and follow the second node to drop the reversed orientation
+        query = """
+                    MATCH (start:Node {board: $board, row: 0, col: 0})-[:MOVE]->(closing:Node)
+                    WITH start, collect(closing) AS closing
+                    CALL apoc.path.expandConfig(start, {
+                        relationshipFilter: 'MOVE>',
+                        labelFilter: 'Node',
+                        uniqueness: 'NODE_PATH',
+                        minLevel: $pathLength,
+                        maxLevel: $pathLength,
+                        endNodes: closing,
+                        bfs: false
+                    }) YIELD path
+                    WITH path, nodes(path)[1] AS second, last(nodes(path)) AS last
+                    WHERE second.row < last.row OR (second.row = last.row AND second.col < last.col)
+                    RETURN path
                 """
-        self.create_projection(query, graph_name="myGraph")
+        query += f"LIMIT {n}" if n else ""
+        parameters = {"pathLength": self.board_graph.board.size() - 1, "board": self.board_id}
+        result = self.run_query(query=query, parameters=parameters)
+        return self.parse_path(result)
+
+    def write_centralities(self, centralities: List[str] = ["degree"]) -> None:
+        """
+            Compute the given centrality measures over the current board graph, and write them as node properties;
+            measures already written are not computed again.
 
+            :param centralities: The GDS centrality algorithms to run.
+        """
+        parameters = {"board": self.board_id, "graphName": f"board_{self.board_id}"}
+        missing = []
         for centrality in centralities:
             has_centrality = f"""
-                MATCH (n:Node {{row: {i}, col: {j}}})
-                RETURN n.{centrality} IS NOT NULL AS has{centrality.capitalize()}
+                MATCH (n:Node {{board: $board}})
+                RETURN count(n.{centrality}) > 0 AS has{centrality.capitalize()}
                             """
-            result = self.run_query(has_centrality)
+            result = self.run_query(has_centrality, parameters)
             if not result[0][f'has{centrality.capitalize()}']:
-                compute_centrality = f"""
-                                    CALL gds.{centrality}.write(
-                                        'myGraph',
-                                        {{
-                                            writeProperty: '{centrality}'
-                                        }}
-                                        );"""
-                self.run_query(compute_centrality)
-        
-        query = f"""
-                    MATCH (n:Node {{row: {i}, col: {j}}})
-                    RETURN
+                missing.append(centrality)
+        if not missing:
+            return
+        if not self.is_gds_installed():
+            raise RuntimeError("GDS is not installed.")
+
+        # project the current board only, by Cypher aggregation, in a projection of its own
+        query = """
+                    MATCH (source:Node {board: $board})
+                    OPTIONAL MATCH (source)-[:MOVE]->(target:Node)
+                    RETURN gds.graph.project($graphName, source, target) AS projection
                 """
-        for centrality in centralities:
-            query += f"n.{centrality} AS {centrality},\n"
-        query = query.rstrip(",\n") + "\n"
+        self.create_projection(query, graph_name=parameters["graphName"], parameters=parameters)
+
+        for centrality in missing:
+            compute_centrality = f"""
+                                CALL gds.{centrality}.write(
+                                    $graphName,
+                                    {{
+                                        writeProperty: '{centrality}'
+                                    }}
+                                    );"""
+            self.run_query(compute_centrality, parameters)
+
+    def node_centrality(self, i: int, j: int, centralities: List[str] = ["degree"]) -> Dict:
+        """
+            Calculate the centrality measures of a node at position (i, j), including degree, closeness, and betweenness.
+        """
 
-        result = self.run_query(query)
+        if not self.board_graph.board.is_valid_cell(i, j):
+            raise ValueError(f"Invalid node position: ({i}, {j})")
+        self.write_centralities(centralities)
+
+        query, parameters = self.centrality_query(i, j, centralities)
+        result = self.run_query(query, parameters)
 
         return result[0] if result else {}
     
+    def create_solution_indexes(self) -> None:
+        """
+            Create the indexes used by exported solutions: board cells by position, solutions by board and id,
+            and steps by number, so that "all solutions through a cell at step k" is an index lookup.
+        """
+        self.create_board_indexes()
+        self.run_query("CREATE CONSTRAINT solution_board_id IF NOT EXISTS FOR (s:Solution) REQUIRE (s.board, s.id) IS UNIQUE")
+        self.run_query("CREATE INDEX solution_board IF NOT EXISTS FOR (s:Solution) ON (s.board)")
+        self.run_query("CREATE INDEX step_k IF NOT EXISTS FOR ()-[s:STEP]-() ON (s.k)")
+
+    def export_solutions(self, paths: Iterable[List[Tuple[int, int]]], batch_size: int = 1000, steps: bool = True) -> int:
+        """
+            Write solutions of the current board into the database as :Solution nodes, tagged with the board.
+            Each solution stores its path as a compact integer array of cell indices (row * c + col), and, with
+            `steps`, is linked to the board cells by (:Solution)-[:STEP {k}]->(:Node) relationships, k from 1.
+            A solution is identified by a hash of its board and its cells, so that exporting it again, from
+            this job or a concurrent one, matches the stored node instead of adding a duplicate.
+
+            :param paths: The solutions, each a list of (row, col) tuples.
+            :param batch_size: The number of solutions written per transaction.
+            :param steps: Whether to also create the STEP relationships.
+            :return: The number of exported solutions, those already stored included.
+        """
+        if not self.is_server_running():
+            raise RuntimeError("Neo4j server is not running.")
+        self.create_solution_indexes()
+
+        query = """
+                    UNWIND $batch AS solution
+                    MERGE (s:Solution {board: $board, id: solution.id})
+                    ON CREATE SET s.cells = solution.cells
+                """
+        if steps:
+            # cells are looked up once per batch by index, rather than matched once per step
+            query = """
+                        MATCH (n:Node {board: $board})
+                        WITH n ORDER BY n.row, n.col
+                        WITH collect(n) AS nodes
+                        UNWIND $batch AS solution
+                        MERGE (s:Solution {board: $board, id: solution.id})
+                        ON CREATE SET s.cells = solution.cells
+                        WITH s, solution, nodes
+                        UNWIND range(0, size(solution.cells) - 1) AS k
+                        WITH s, nodes[solution.cells[k]] AS n, k
+                        MERGE (s)-[:STEP {k: k + 1}]->(n)
+                    """
+
+        cols = self.board_graph.board.c
+        exported = 0
+        batch: List[Dict] = []
+        for path in paths:
+            cells = [row * cols + col for row, col in path]
+            key = hashlib.blake2b(f"{self.board_id}:{cells}".encode(), digest_size=16).hexdigest()
+            batch.append({"id": key, "cells": cells})
+            exported += 1
+            if len(batch) >= batch_size:
+                self.graph.run(query, {"batch": batch, "board": self.board_id})
+                batch = []
+        if batch:
+            self.graph.run(query, {"batch": batch, "board": self.board_id})
+        return exported
+
+    def solutions_through(self, row: int, col: int, k: int) -> List[List[Tuple[int, int]]]:
+        """
+            Get the exported solutions that visit the given cell at step k.
+
+            :param row: The row of the cell.
+            :param col: The column of the cell.
+            :param k: The step number, from 1.
+            :return: The solutions, each a list of (row, col) tuples.
+        """
+        query = """
+                    MATCH (:Node {board: $board, row: $row, col: $col})<-[:STEP {k: $k}]-(s:Solution)
+                    RETURN s.cells AS cells
+                """
+        result = self.run_query(query, {"board": self.board_id, "row": row, "col": col, "k": k})
+        cols = self.board_graph.board.c
+        return [[divmod(cell, cols) for cell in record["cells"]] for record in result]
+
     def get_property_indices(self, row: int, col: int, property: str):
         return self.get_property({
+            "board": self.board_id,
             "row": row,
             "col": col
         }, property=property)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from enum import Enum
+
+class QueryType(Enum):
+    """
+        Enum for the type of query to run.
+    """
+    RAW = "RAW"
+    CONSTRUCTIVE = "CONSTRUCTIVE"
+    APOC = "APOC"
+    INCREMENTAL = "INCREMENTAL"
+    PYTHON = "PYTHON"
+    JIT = "JIT"
+
+    @staticmethod
+    def from_str(val: str):
+        for query_type in QueryType:
+            if query_type.name == val.upper():
+                return query_type
+        raise ValueError(f"Unknown QueryType: {val}")
@@ -0,0 +1,204 @@
+import random
+from typing import Iterator, List, Optional, Tuple
+
+from src.diplomatico.board import Board
+from src.diplomatico.feasibility import FeasibilityChecker
+
+class BackbiteSampler:
+    """
+        Sampler of random Hamiltonian paths, for boards too large to enumerate, by a backbite Markov chain.
+
+        A backbite move picks an end of the path and one of its moves: if that move lands on the path, the
+        end is joined to it and the dangling piece is reversed, so that its other end becomes the new end of
+        the path. Moves are proposed among `max_degree` slots, the missing ones leaving the path unchanged,
+        which makes the chain symmetric: its stationary distribution is uniform over the Hamiltonian paths it
+        can reach from the initial one. Reachability of every path is not guaranteed on every move graph.
+    """
+
+    def __init__(self, board: Board, seed: Optional[int] = None, path: Optional[List[Tuple[int, int]]] = None):
+        """
+            :param board: The board to sample the Hamiltonian paths of.
+            :param seed: Optional seed of the random generator, for reproducible samples.
+            :param path: Optional initial Hamiltonian path; by default, one found by a randomized Warnsdorf search.
+        """
+        self.board = board
+        self.neighbors = board.table.neighbors
+        self.max_degree = max(len(cells) for cells in self.neighbors)
+        self.random = random.Random(seed)
+        if path is None:
+            path = self._initial_path()
+        self.path: List[int] = [row * board.c + col for row, col in path]
+        if sorted(self.path) != list(range(board.size())):
+            raise ValueError("The initial path must visit every cell exactly once.")
+        # position of each cell in the path
+        self.position: List[int] = [0] * board.size()
+        for k, cell in enumerate(self.path):
+            self.position[cell] = k
+        self.steps = 0
+        self.accepted = 0
+
+    def _ordered_moves(self, cell: int, visited: List[bool]) -> List[int]:
+        """
+            Get the unvisited cells one move away, the one Warnsdorf's rule tries first last, ties broken at random.
+        """
+        moves = [j for j in self.neighbors[cell] if not visited[j]]
+        self.random.shuffle(moves)
+        moves.sort(key=lambda j: sum(1 for k in self.neighbors[j] if not visited[k]), reverse=True)
+        return moves
+
+    def _search_path(self, start: int, budget: int) -> Tuple[Optional[List[int]], bool]:
+        """
+            Search a Hamiltonian path from the start cell by a randomized Warnsdorf depth-first search,
+            giving up once it has visited `budget` nodes.
+
+            :return: The path found, if any, and whether the search was exhausted without finding one.
+        """
+        size = self.board.size()
+        visited = [False] * size
+        visited[start] = True
+        path = [start]
+        stack = [self._ordered_moves(start, visited)]
+        nodes = 1
+        while stack:
+            if len(path) == size:
+                return path, False
+            if not stack[-1]:
+                stack.pop()
+                visited[path.pop()] = False
+                continue
+            if nodes >= budget:
+                return None, False
+            cell = stack[-1].pop()
+            visited[cell] = True
+            path.append(cell)
+            nodes += 1
+            stack.append(self._ordered_moves(cell, visited))
+        return None, True
+
+    def _initial_path(self) -> List[Tuple[int, int]]:
+        """
+            Find a Hamiltonian path with bounded randomized Warnsdorf searches, any end allowed. The start cells
+            are tried in random order, each with a node budget that doubles every round, so that no single
+            start can stall the search; different seeds may also start from different paths.
+        """
+        board = self.board
+        checker = FeasibilityChecker.from_board(board)
+        starts = [i for i in range(board.size()) if checker.check(divmod(i, board.c)) is None]
+        self.random.shuffle(starts)
+        budget = 4 * board.size()
+        while starts:
+            exhausted = []
+            for start in starts:
+                path, done = self._search_path(start, budget)
+                if path is not None:
+                    return [divmod(i, board.c) for i in path]
+                if done:
+                    exhausted.append(start)
+            # a start whose whole search tree was explored has no path
+            starts = [start for start in starts if start not in exhausted]
+            budget *= 2
+        raise ValueError(f"The {board.r}x{board.c} board has no Hamiltonian path.")
+
+    def step(self) -> bool:
+        """
+            Propose a backbite move.
+
+            :return: Whether the path changed.
+        """
+        self.steps += 1
+        path, position = self.path, self.position
+        last = len(path) - 1
+        if last < 2:
+            return False
+        if self.random.random() < 0.5:
+            # tail end: join it to the k-th cell, and reverse the piece after that cell
+            moves = self.neighbors[path[last]]
+            slot = self.random.randrange(self.max_degree)
+            if slot >= len(moves) or position[moves[slot]] == last - 1:
+                return False
+            begin, end = position[moves[slot]] + 1, last + 1
+        else:
+            # head end: join it to the k-th cell, and reverse the piece before that cell
+            moves = self.neighbors[path[0]]
+            slot = self.random.randrange(self.max_degree)
+            if slot >= len(moves) or position[moves[slot]] == 1:
+                return False
+            begin, end = 0, position[moves[slot]]
+        path[begin:end] = path[begin:end][::-1]
+        for i in range(begin, end):
+            position[path[i]] = i
+        self.accepted += 1
+        return True
+
+    def sample(self, n: int, thin: Optional[int] = None, burn_in: int = 0) -> Iterator[List[int]]:
+        """
+            Stream random Hamiltonian paths, as lists of cell indices (row * c + col).
+
+            :param n: The number of paths to produce.
+            :param thin: The number of moves proposed between consecutive paths; defaults to the board size.
+            :param burn_in: The number of moves proposed before the first path.
+            :return: An iterator over the paths, each a new list.
+        """
+        thin = thin if thin is not None else self.board.size()
+        for _ in range(burn_in):
+            self.step()
+        for _ in range(n):
+            for _ in range(thin):
+                self.step()
+            yield list(self.path)
+
+    def acceptance_rate(self) -> float:
+        """
+            Get the fraction of the proposed moves that changed the path.
+        """
+        return self.accepted / self.steps if self.steps else 0.0
+
+import unittest
+
+class TestBackbiteSampler(unittest.TestCase):
+    def _is_hamiltonian(self, board: Board, path: List[int]) -> bool:
+        if sorted(path) != list(range(board.size())):
+            return False
+        return all(b in board.table.neighbors[a] for a, b in zip(path, path[1:]))
+
+    def test_valid_paths(self):
+        board = Board(8, 8)
+        sampler = BackbiteSampler(board, seed=1)
+        paths = list(sampler.sample(20, thin=10))
+        self.assertEqual(len(paths), 20)
+        self.assertTrue(all(self._is_hamiltonian(board, path) for path in paths))
+        self.assertGreater(len({tuple(path) for path in paths}), 1)
+        self.assertGreater(sampler.acceptance_rate(), 0)
+
+    def test_reproducible(self):
+        first = list(BackbiteSampler(Board(6, 6), seed=7).sample(5))
+        second = list(BackbiteSampler(Board(6, 6), seed=7).sample(5))
+        self.assertEqual(first, second)
+
+    def test_covers_small_board(self):
+        # across a few seeds, the chains should visit many of the 144 paths of the 4x5 board
+        board = Board(4, 5)
+        seen = {tuple(path) for seed in range(5) for path in BackbiteSampler(board, seed=seed).sample(500, thin=5)}
+        self.assertTrue(all(self._is_hamiltonian(board, list(path)) for path in seen))
+        self.assertGreater(len(seen), 20)
+
+    def test_initial_path_large_boards(self):
+        import time
+        for (r, c), seed in [((7, 7), 1), ((6, 11), 2), ((16, 16), 1), ((16, 16), 2), ((16, 16), 3), ((16, 16), None)]:
+            start_time = time.time()
+            sampler = BackbiteSampler(Board(r, c), seed=seed)
+            self.assertLess(time.time() - start_time, 1, f"{r}x{c}, seed {seed}")
+            self.assertTrue(self._is_hamiltonian(sampler.board, sampler.path))
+
+    def test_no_path(self):
+        with self.assertRaises(ValueError):
+            BackbiteSampler(Board(3, 5))
+        with self.assertRaises(ValueError):
+            BackbiteSampler(Board(3, 3))
+
+    def test_invalid_initial_path(self):
+        with self.assertRaises(ValueError):
+            BackbiteSampler(Board(4, 5), path=[(0, 0), (0, 3)])
+
+if __name__ == "__main__":
+    unittest.main()
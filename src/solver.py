@@ -1,7 +1,22 @@
-from typing import Optional, Tuple, List
-from tqdm import tqdm
+from typing import Optional, Tuple, List, Collection, Dict, Set, Callable
 
 from src.diplomatico.board import Board
+from src.diplomatico.feasibility import FeasibilityChecker
+
+class _PathSink:
+    """
+        Stand-in for the list of found paths, handing each path to a callback instead of storing it.
+    """
+    def __init__(self, on_path: Callable[[List[Tuple[int, int]]], None]):
+        self.on_path = on_path
+        self.found = 0
+
+    def append(self, path: List[Tuple[int, int]]) -> None:
+        self.on_path(path)
+        self.found += 1
+
+    def __len__(self):
+        return self.found
 
 class Solver:
     """
@@ -10,38 +25,55 @@ class Solver:
     def __init__(self, board: Board, warnsdorf: bool = True):
         self.board = board
         self.warnsdorf = warnsdorf
+        self.feasibility = FeasibilityChecker.from_board(board)
+        # why each (start, end) pair skipped by the last search cannot have a path; None stands for any cell
+        self.rejected: Dict[Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]], str] = {}
 
-    def _backtrack(self, current_pos: Tuple[int, int], ending_point: Tuple[int, int], paths: List[List[Tuple[int, int]]], current_path: List[Tuple[int, int]], n: Optional[int]) -> None:
+    def _rejects(self, start: Optional[Tuple[int, int]], end: Optional[Tuple[int, int]]) -> bool:
+        """
+            Check whether a (start, end) pair cannot have any Hamiltonian path, recording why.
+        """
+        reason = self.feasibility.check(start, end)
+        if reason is not None:
+            self.rejected[(start, end)] = reason
+        return reason is not None
+
+    def _backtrack(self, current_pos: Tuple[int, int], ending_points: Collection[Tuple[int, int]], paths: List[List[Tuple[int, int]]], current_path: List[Tuple[int, int]], n: Optional[int], domains: Optional[List[Set[Tuple[int, int]]]] = None) -> None:
         """
             Backtracking algorithm to find Hamiltonian paths.
 
             :param current_pos: The current position on the board as (row, col).
-            :param ending_point: The required ending position on the board as (row, col).
+            :param ending_points: The allowed ending positions on the board as (row, col).
             :param paths: The list to store found paths.
             :param current_path: The current path being explored.
             :param n: The maximum number of paths to find (None for unlimited).
+            :param domains: Optional allowed positions for each step number (index 0 unused).
         """
         if self.board.is_complete():
             paths.append(current_path.copy())
             return
         
         moves = self.board.available_moves(current_pos[0], current_pos[1])
+        if domains is not None:
+            domain = domains[self.board.step]
+            moves = [move for move in moves if move in domain]
         if self.warnsdorf:
             moves.sort(     # Warnsdorf's rule
                 key=lambda move: len(self.board.available_moves(move[0], move[1]))
             )
         for move in moves:
-            if self.board.step == self.board.size() and move != ending_point:
+            if self.board.step == self.board.size() and move not in ending_points:
                 continue
             if self.board.move(current_pos, move):
                 current_path.append(move)
-                self._backtrack(move, ending_point, paths, current_path, n)
+                self._backtrack(move, ending_points, paths, current_path, n, domains)
                 if paths and n is not None and len(paths) >= n:
                     return
                 self.board.unmove(move)
                 current_path.pop()
 
-    def solve(self, starting_point: Optional[Tuple[int, int]] = None, ending_point: Optional[Tuple[int, int]] = None, n: Optional[int] = None, progress: bool = False) -> List[List[Tuple[int, int]]]:
+    def solve(self, starting_point: Optional[Tuple[int, int]] = None, ending_point: Optional[Tuple[int, int]] = None, n: Optional[int] = None, progress: bool = False,
+              on_path: Optional[Callable[[List[Tuple[int, int]]], None]] = None) -> List[List[Tuple[int, int]]]:
         """
             Solve the Hamiltonian path problem using backtracking.
 
@@ -49,27 +81,489 @@ class Solver:
             :param ending_point: Optional ending point as (row, col).
             :param n: The maximum number of paths to find (None for unlimited).
             :param progress: Whether to show progress (only for PYTHON query type).
-            :return: A list of found Hamiltonian paths, each path is a list of (row, col) tuples.
+            :param on_path: Optional callback receiving each path as it is found; the paths are then not stored.
+            :return: A list of found Hamiltonian paths, each path is a list of (row, col) tuples (empty with on_path).
         """
         starting_points = [starting_point] if starting_point else [(r, c) for r in range(self.board.r) for c in range(self.board.c)]
         ending_points = [ending_point] if ending_point else [(r, c) for r in range(self.board.r) for c in range(self.board.c)]
         if progress:
+            from tqdm import tqdm
             starting_points = tqdm(starting_points, desc="Start Nodes")
             ending_points = tqdm(ending_points, desc="End Nodes")
-        paths: List[List[Tuple[int, int]]] = []
+        paths: List[List[Tuple[int, int]]] = [] if on_path is None else _PathSink(on_path)  # type: ignore
+        self.rejected = {}
 
         while True:
             for start in starting_points:
                 for end in ending_points:
-                    if start == end:
+                    if start == end or self._rejects(start, end):
                         continue
 
                     self.board.first_move(start)
                     current_path = [start]
-                    self._backtrack(start, end, paths, current_path, n)
+                    self._backtrack(start, (end,), paths, current_path, n)
                     if paths and n is not None and len(paths) >= n:
-                        return paths
+                        return paths if on_path is None else []
                     self.board.clean()
             break
 
-        return paths
\ No newline at end of file
+        return paths if on_path is None else []
+
+    def _count_backtrack(self, current_pos: Tuple[int, int], ending_points: Optional[Collection[Tuple[int, int]]], by_end: Optional[List[int]] = None) -> int:
+        """
+            Backtracking algorithm counting the Hamiltonian paths, without building them.
+
+            :param current_pos: The current position on the board as (row, col).
+            :param ending_points: The allowed ending positions on the board as (row, col) (None for any).
+            :param by_end: Optional counts to increment, for each completed path, at the index of its final cell.
+            :return: The number of Hamiltonian paths completing the current one.
+        """
+        if self.board.is_complete():
+            if by_end is not None:
+                by_end[current_pos[0] * self.board.c + current_pos[1]] += 1
+            return 1
+        count = 0
+        last = self.board.step == self.board.size()
+        for move in self.board.available_moves(current_pos[0], current_pos[1]):
+            if last and ending_points is not None and move not in ending_points:
+                continue
+            self.board.move(current_pos, move)
+            count += self._count_backtrack(move, ending_points, by_end)
+            self.board.unmove(move)
+        return count
+
+    def count(self, starting_point: Optional[Tuple[int, int]] = None, ending_point: Optional[Tuple[int, int]] = None, k: int = 0) -> int:
+        """
+            Count the Hamiltonian paths, as many as `solve` would return, without building them.
+            The first k levels of the search are expanded breadth-first, all at once, merging the partial paths
+            that reach the same cell through the same cells; each merged state is then searched depth-first once.
+
+            :param starting_point: Optional starting point as (row, col).
+            :param ending_point: Optional ending point as (row, col).
+            :param k: The number of levels expanded breadth-first (0 for a depth-first search only).
+            :return: The number of Hamiltonian paths.
+        """
+        board = self.board
+        starting_points = [starting_point] if starting_point else [(r, c) for r in range(board.r) for c in range(board.c)]
+        ending_points = (ending_point,) if ending_point else None
+        self.rejected = {}
+        starting_points = [start for start in starting_points if not self._rejects(start, ending_point)]
+        if board.size() < 2:
+            return 0
+        if k <= 0:
+            count = 0
+            for start in starting_points:
+                if not board.first_move(start):
+                    continue
+                count += self._count_backtrack(start, ending_points)
+            board.clean()
+            return count
+
+        from src.diplomatico.frontier import expand_frontier
+        frontier = expand_frontier(
+            board.table, [row * board.c + col for row, col in starting_points], k,
+            end=ending_point[0] * board.c + ending_point[1] if ending_point else None
+        )
+        count = 0
+        for i in range(len(frontier)):
+            current = divmod(int(frontier.current[i]), board.c)
+            cells = [divmod(j, board.c) for j in frontier.cells(i)]
+            cells.remove(current)
+            board.restore(cells, current)
+            count += int(frontier.counts[i]) * self._count_backtrack(current, ending_points)
+        board.clean()
+        return count
+
+    def count_matrix(self, starting_points: Optional[List[Tuple[int, int]]] = None, progress: bool = False) -> List[List[int]]:
+        """
+            Count the Hamiltonian paths between every pair of cells, with a single search per start cell
+            whose completed paths are bucketed by their final cell.
+
+            :param starting_points: Optional start cells as (row, col) to count the paths of (None for all).
+            :param progress: Whether to show progress over the start cells.
+            :return: The N x N matrix whose entry [i][j] counts the paths from cell index i to cell index j
+                (row * c + col); the rows of the other start cells are zero.
+        """
+        board = self.board
+        size = board.size()
+        matrix = [[0] * size for _ in range(size)]
+        if starting_points is None:
+            starting_points = [(r, c) for r in range(board.r) for c in range(board.c)]
+        if progress:
+            from tqdm import tqdm
+            starting_points = tqdm(starting_points, desc="Start Nodes")
+        if size < 2:
+            return matrix
+        self.rejected = {}
+        for start in starting_points:
+            if not self._rejects(start, None) and board.first_move(start):
+                self._count_backtrack(start, None, matrix[start[0] * board.c + start[1]])
+        board.clean()
+        return matrix
+
+    def solve_by_end(self, starting_point: Optional[Tuple[int, int]] = None, n: Optional[int] = None, progress: bool = False) -> Dict[Tuple[int, int], List[List[Tuple[int, int]]]]:
+        """
+            Find the Hamiltonian paths with a single search per start cell, grouping them by their final cell,
+            instead of one search per (start, end) pair as `solve` does.
+
+            :param starting_point: Optional starting point as (row, col).
+            :param n: The maximum number of paths to find (None for unlimited).
+            :param progress: Whether to show progress over the start cells.
+            :return: A dictionary mapping each final cell to the paths ending there.
+        """
+        board = self.board
+        starting_points = [starting_point] if starting_point else [(r, c) for r in range(board.r) for c in range(board.c)]
+        ending_points = {(r, c) for r in range(board.r) for c in range(board.c)}
+        if progress:
+            from tqdm import tqdm
+            starting_points = tqdm(starting_points, desc="Start Nodes")
+        paths: List[List[Tuple[int, int]]] = []
+        self.rejected = {}
+        if board.size() >= 2:
+            for start in starting_points:
+                if self._rejects(start, None):
+                    continue
+                board.first_move(start)
+                self._backtrack(start, ending_points, paths, [start], n)
+                board.clean()
+                if paths and n is not None and len(paths) >= n:
+                    break
+        return self.group_by_end(paths)
+
+    @staticmethod
+    def group_by_end(paths: List[List[Tuple[int, int]]]) -> Dict[Tuple[int, int], List[List[Tuple[int, int]]]]:
+        """
+            Group paths by their final cell, keeping their order.
+
+            :param paths: The paths, each a list of (row, col) tuples.
+            :return: A dictionary mapping each final cell to the paths ending there.
+        """
+        grouped: Dict[Tuple[int, int], List[List[Tuple[int, int]]]] = {}
+        for path in paths:
+            grouped.setdefault(path[-1], []).append(path)
+        return grouped
+
+    def solve_cycles(self, n: Optional[int] = None, progress: bool = False) -> List[List[Tuple[int, int]]]:
+        """
+            Find Hamiltonian cycles, i.e. Hamiltonian paths whose last cell is one move away from the first.
+            The start is fixed to the canonical cell (0, 0), and each cycle is returned once, in the
+            orientation whose second cell precedes its last one.
+
+            :param n: The maximum number of cycles to find (None for unlimited).
+            :param progress: Whether to show progress over the second cell of the cycle.
+            :return: A list of found Hamiltonian cycles, each cycle is a list of (row, col) tuples starting at (0, 0).
+        """
+        start = (0, 0)
+        self.board.clean()
+        closing = sorted(self.board.available_moves(start[0], start[1]))
+        cycles: List[List[Tuple[int, int]]] = []
+        if self.board.size() < 3:
+            return cycles
+
+        seconds = closing
+        if progress:
+            from tqdm import tqdm
+            seconds = tqdm(seconds, desc="Second Nodes")
+        for second in seconds:
+            # the last cell must close the cycle, and follow the second cell to drop the reversed orientation
+            ending_points = {end for end in closing if end > second}
+            if not ending_points:
+                continue
+            self.board.first_move(start)
+            self.board.move(start, second)
+            current_path = [start, second]
+            self._backtrack(second, ending_points, cycles, current_path, n)
+            self.board.clean()
+            if cycles and n is not None and len(cycles) >= n:
+                break
+
+        return cycles
+
+    @staticmethod
+    def rotate_cycle(cycle: List[Tuple[int, int]], start: Tuple[int, int], reverse: bool = False) -> List[Tuple[int, int]]:
+        """
+            Open a Hamiltonian cycle into the Hamiltonian path starting at the given cell.
+
+            :param cycle: The Hamiltonian cycle as a list of (row, col) tuples.
+            :param start: The cell the resulting path should start from.
+            :param reverse: Whether to walk the cycle in the opposite direction.
+            :return: The Hamiltonian path as a list of (row, col) tuples.
+        """
+        k = cycle.index(start)
+        path = cycle[k:] + cycle[:k]
+        if reverse:
+            path = path[:1] + path[:0:-1]
+        return path
+
+    @staticmethod
+    def paths_from_cycles(cycles: List[List[Tuple[int, int]]]) -> Dict[Tuple[int, int], List[List[Tuple[int, int]]]]:
+        """
+            Derive, for every start cell, the open Hamiltonian paths obtained by rotating the given cycles.
+            Each cycle yields two paths per cell, one for each direction.
+
+            :param cycles: The Hamiltonian cycles, as returned by `solve_cycles`.
+            :return: A dictionary mapping each start cell to its list of paths.
+        """
+        paths: Dict[Tuple[int, int], List[List[Tuple[int, int]]]] = {}
+        for cycle in cycles:
+            for start in cycle:
+                paths.setdefault(start, []).append(Solver.rotate_cycle(cycle, start))
+                paths[start].append(Solver.rotate_cycle(cycle, start, reverse=True))
+        return paths
+
+    def _propagate(self, clues: Dict[Tuple[int, int], int]) -> Optional[List[Set[Tuple[int, int]]]]:
+        """
+            Compute the allowed positions of every step number given the fixed ones.
+            A free number k can only lie within k - a moves of the previous clue a, and within b - k moves
+            of the next clue b; consecutive numbers must then be one move apart, until a fixpoint is reached.
+
+            :param clues: The fixed numbers, as a dictionary mapping (row, col) to the step number.
+            :return: The allowed positions for each step number (index 0 unused), or None if the clues are inconsistent.
+        """
+        size = self.board.size()
+        cols = self.board.c
+        neighbors = self.board.table.neighbors
+        fixed: Dict[int, int] = {}
+        for (row, col), k in clues.items():
+            if not self.board.is_valid_cell(row, col):
+                raise ValueError(f"Invalid clue cell: ({row}, {col})")
+            if not 1 <= k <= size:
+                raise ValueError(f"Invalid clue number {k} at ({row}, {col})")
+            if k in fixed:
+                return None
+            fixed[k] = row * cols + col
+
+        # move distances from every clue, by breadth-first search on the empty board
+        distances: Dict[int, List[int]] = {}
+        for k, cell in fixed.items():
+            dist = [size] * size
+            dist[cell] = 0
+            frontier = [cell]
+            while frontier:
+                next_frontier = []
+                for i in frontier:
+                    for j in neighbors[i]:
+                        if dist[j] == size:
+                            dist[j] = dist[i] + 1
+                            next_frontier.append(j)
+                frontier = next_frontier
+            distances[k] = dist
+
+        clue_numbers = sorted(fixed)
+        taken = set(fixed.values())
+        free = [i for i in range(size) if i not in taken]
+        domains: List[Set[int]] = [set()]
+        for k in range(1, size + 1):
+            if k in fixed:
+                domains.append({fixed[k]})
+                continue
+            previous = [a for a in clue_numbers if a < k]
+            following = [b for b in clue_numbers if b > k]
+            domain = set(free)
+            if previous:
+                a = previous[-1]
+                domain = {i for i in domain if distances[a][i] <= k - a}
+            if following:
+                b = following[0]
+                domain = {i for i in domain if distances[b][i] <= b - k}
+            domains.append(domain)
+
+        changed = True
+        while changed:
+            changed = False
+            for k in range(1, size + 1):
+                domain = domains[k]
+                if k > 1:
+                    domain = {i for i in domain if any(j in domains[k - 1] for j in neighbors[i])}
+                if k < size:
+                    domain = {i for i in domain if any(j in domains[k + 1] for j in neighbors[i])}
+                if not domain:
+                    return None
+                if len(domain) < len(domains[k]):
+                    domains[k] = domain
+                    changed = True
+            # a number with a single allowed position owns it
+            for k in range(1, size + 1):
+                if len(domains[k]) == 1:
+                    (cell,) = domains[k]
+                    for other in range(1, size + 1):
+                        if other != k and cell in domains[other]:
+                            domains[other].discard(cell)
+                            if not domains[other]:
+                                return None
+                            changed = True
+
+        return [{divmod(i, cols) for i in domain} for domain in domains]
+
+    def solve_puzzle(self, clues: Dict[Tuple[int, int], int], n: Optional[int] = None, progress: bool = False) -> List[List[Tuple[int, int]]]:
+        """
+            Complete a partially-filled board, searching only the paths consistent with the fixed numbers.
+
+            :param clues: The fixed numbers, as a dictionary mapping (row, col) to the step number.
+            :param n: The maximum number of paths to find (None for unlimited).
+            :param progress: Whether to show progress over the candidate starting points.
+            :return: A list of found Hamiltonian paths, each path is a list of (row, col) tuples.
+        """
+        paths: List[List[Tuple[int, int]]] = []
+        domains = self._propagate(clues)
+        if domains is None:
+            return paths
+
+        starting_points = sorted(domains[1])
+        if progress:
+            from tqdm import tqdm
+            starting_points = tqdm(starting_points, desc="Start Nodes")
+        for start in starting_points:
+            self.board.first_move(start)
+            current_path = [start]
+            self._backtrack(start, domains[-1], paths, current_path, n, domains)
+            if paths and n is not None and len(paths) >= n:
+                return paths
+            self.board.clean()
+
+        return paths
+
+import unittest
+
+class TestSolver(unittest.TestCase):
+    def _is_path(self, board: Board, path: List[Tuple[int, int]]) -> bool:
+        if sorted(path) != [(r, c) for r in range(board.r) for c in range(board.c)]:
+            return False
+        return all(b in board.table.moves[a[0] * board.c + a[1]] for a, b in zip(path, path[1:]))
+
+    def _brute_force_cycles(self, board: Board) -> int:
+        # directed Hamiltonian cycles through cell 0, each undirected cycle counted twice
+        neighbors = board.table.neighbors
+        full = (1 << board.size()) - 1
+
+        def extend(cell: int, visited: int) -> int:
+            if visited == full:
+                return 1 if 0 in neighbors[cell] else 0
+            return sum(extend(j, visited | (1 << j)) for j in neighbors[cell] if not visited & (1 << j))
+
+        return extend(0, 1) // 2
+
+    def test_solve_cycles(self):
+        for r, c, expected in [(4, 5, 2), (5, 5, 48)]:
+            board = Board(r, c)
+            cycles = Solver(board).solve_cycles()
+            self.assertEqual(len(cycles), expected)
+            self.assertEqual(len(cycles), self._brute_force_cycles(Board(r, c)))
+            for cycle in cycles:
+                self.assertEqual(cycle[0], (0, 0))
+                self.assertTrue(self._is_path(board, cycle))
+                self.assertIn(cycle[-1], board.table.moves[0])
+            self.assertEqual(len({tuple(cycle) for cycle in cycles}), len(cycles))
+        self.assertEqual(len(Solver(Board(5, 5)).solve_cycles(n=3)), 3)
+
+    def test_rotate_cycle(self):
+        board = Board(5, 5)
+        cycle = Solver(board).solve_cycles(n=1)[0]
+        for start in [(0, 0), (2, 2), (4, 1)]:
+            for reverse in (False, True):
+                path = Solver.rotate_cycle(cycle, start, reverse=reverse)
+                self.assertEqual(path[0], start)
+                self.assertTrue(self._is_path(board, path))
+        self.assertEqual(Solver.rotate_cycle(cycle, (0, 0)), cycle)
+        self.assertEqual(Solver.rotate_cycle(cycle, (0, 0), reverse=True)[1], cycle[-1])
+
+    def test_paths_from_cycles(self):
+        board = Board(5, 5)
+        cycles = Solver(board).solve_cycles()
+        paths = Solver.paths_from_cycles(cycles)
+        self.assertEqual(len(paths), board.size())
+        for start, started in paths.items():
+            self.assertEqual(len(started), 2 * len(cycles))
+            self.assertEqual(len({tuple(path) for path in started}), len(started))
+            self.assertTrue(all(path[0] == start and self._is_path(board, path) for path in started))
+
+    def test_solve_on_path(self):
+        paths = Solver(Board(4, 5)).solve()
+        seen: List[List[Tuple[int, int]]] = []
+        self.assertEqual(Solver(Board(4, 5)).solve(on_path=seen.append), [])
+        # every path reaches the callback, in the order of the list, and is not modified afterwards
+        self.assertEqual(seen, paths)
+        self.assertEqual(len({tuple(path) for path in seen}), 144)
+        for kwargs in [{"n": 5}, {"starting_point": (0, 0)}, {"starting_point": (0, 0), "n": 1}]:
+            seen = []
+            self.assertEqual(Solver(Board(4, 5)).solve(on_path=seen.append, **kwargs), [])
+            self.assertEqual(seen, Solver(Board(4, 5)).solve(**kwargs), kwargs)
+
+    def test_count_frontier(self):
+        from src.diplomatico.moves import KNIGHT
+        for r, c, rule in [(4, 5, None), (5, 4, None), (3, 4, KNIGHT)]:
+            board = Board(r, c) if rule is None else Board(r, c, rule=rule)
+            paths = Solver(Board(r, c, rule=board.rule)).solve()
+            self.assertTrue(paths)
+            start, end = paths[0][0], paths[0][-1]
+            anchors = [{}, {"starting_point": start}, {"ending_point": end}, {"starting_point": start, "ending_point": end}]
+            for kwargs in anchors:
+                expected = len(Solver(Board(r, c, rule=board.rule)).solve(**kwargs)) if kwargs else len(paths)
+                # from one level to past a full path, where the breadth-first levels complete the paths themselves
+                for k in (1, 2, 5, board.size() - 1, board.size() + 3):
+                    self.assertEqual(Solver(board).count(k=k, **kwargs), expected, (r, c, kwargs, k))
+            # the restored boards are cleaned up after counting
+            self.assertEqual(board.step, 1)
+
+    def test_count_matrix(self):
+        for r, c in [(4, 5), (4, 6)]:
+            board = Board(r, c)
+            expected = [[0] * board.size() for _ in range(board.size())]
+            for path in Solver(Board(r, c)).solve():
+                expected[path[0][0] * c + path[0][1]][path[-1][0] * c + path[-1][1]] += 1
+            self.assertEqual(Solver(board).count_matrix(), expected)
+            # only the rows of the given start cells are counted
+            matrix = Solver(board).count_matrix(starting_points=[(1, 1)])
+            self.assertEqual(matrix[1 * c + 1], expected[1 * c + 1])
+            self.assertEqual(sum(map(sum, matrix)), sum(expected[1 * c + 1]))
+
+    def test_solve_by_end(self):
+        board = Board(4, 5)
+        for start in [(0, 0), (1, 2), (3, 4)]:
+            paths = Solver(Board(4, 5)).solve(starting_point=start)
+            grouped = Solver(board).solve_by_end(starting_point=start)
+            self.assertEqual(set(grouped), {path[-1] for path in paths})
+            for end, ending in grouped.items():
+                self.assertTrue(all(path[-1] == end for path in ending))
+            found = [tuple(path) for ending in grouped.values() for path in ending]
+            self.assertEqual(sorted(found), sorted(tuple(path) for path in paths))
+        self.assertEqual(sum(map(len, Solver(board).solve_by_end(n=5).values())), 5)
+        self.assertEqual(sum(map(len, Solver(board).solve_by_end().values())), 144)
+
+    def test_puzzle_recovers_solution(self):
+        board = Board(5, 5)
+        solution = Solver(Board(5, 5)).solve(starting_point=(0, 0), n=1)[0]
+        # every third number of a known solution
+        clues = {cell: k for k, cell in enumerate(solution, start=1) if k % 3 == 1}
+        result = Solver(board).solve_puzzle(clues)
+        self.assertIn(solution, result)
+        for path in result:
+            self.assertTrue(self._is_path(board, path))
+            self.assertTrue(all(path[k - 1] == cell for cell, k in clues.items()))
+
+    def test_puzzle_full_clues(self):
+        solution = Solver(Board(4, 5)).solve(n=1)[0]
+        clues = {cell: k for k, cell in enumerate(solution, start=1)}
+        self.assertEqual(Solver(Board(4, 5)).solve_puzzle(clues), [solution])
+
+    def test_contradictory_clues(self):
+        solver = Solver(Board(5, 5))
+        # consecutive numbers on cells that are not one move apart
+        self.assertIsNone(solver._propagate({(0, 0): 1, (0, 1): 2}))
+        self.assertEqual(solver.solve_puzzle({(0, 0): 1, (0, 1): 2}), [])
+        # the same number twice
+        self.assertIsNone(solver._propagate({(0, 0): 3, (4, 4): 3}))
+        # (0, 0) and (0, 3) are one move apart, but 1 and 3 leave no cell one move from both for 2
+        self.assertIsNone(solver._propagate({(0, 0): 1, (0, 3): 3}))
+        # numbers two apart on cells further than two moves apart
+        self.assertIsNone(solver._propagate({(0, 0): 1, (1, 4): 3}))
+
+    def test_invalid_clues(self):
+        solver = Solver(Board(4, 5))
+        with self.assertRaises(ValueError):
+            solver._propagate({(4, 0): 1})
+        with self.assertRaises(ValueError):
+            solver._propagate({(0, 0): 21})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+from typing import Dict, List, Tuple
+
+from src.diplomatico.moves import MoveRule, DIPLOMATICO
+
+# Frontier labels: a saturated (or non-existent) cell, which takes no more moves, and an untouched cell;
+# labels from FRAGMENT on name the path fragment a degree-1 cell is an end of.
+SATURATED = 0
+UNTOUCHED = 1
+FRAGMENT = 2
+
+# A state packs the labels of the frontier cells, then the number of fixed path endpoints and whether the
+# path is complete, one byte each: compact to store and cheap to hash and compare.
+State = bytes
+
+class TransferMatrixCounter:
+    """
+        Counter of the Hamiltonian paths of r x c boards with a fixed number of rows, for every width at once.
+
+        The board is swept column by column, cell by cell. A state records, for the cells of the last
+        `reach` + 1 columns (3 + 1 for Diplomatico), whether each is saturated, untouched or the end of a path
+        fragment, plus how many path endpoints were already fixed and whether the path is complete. A cell
+        leaves the frontier as soon as its last move is swept. Since every column is swept alike, the
+        transitions only depend on the state: they are compiled once, kept however many, and reused for every
+        width.
+
+        The number of reachable states bounds the widths, and it grows with the frontier, (reach + 1) * r cells.
+        With knight moves on 4 rows, the states saturate at about 9,000 after a few columns, so every further
+        column costs the same: the counts up to 4 x 40 take seconds. With Diplomatico moves, the 16-cell frontier
+        of 4 rows keeps growing about 4-5 times per column, with most states never completing on boards up to
+        8 columns wide: 4 x 8 takes over a minute and a gigabyte, only about twice as fast as `Solver.count`,
+        and wider boards are out of reach.
+    """
+
+    def __init__(self, r: int, rule: MoveRule = DIPLOMATICO):
+        """
+            :param r: Number of rows of the board.
+            :param rule: The move rule of the game; its offsets must be closed under negation.
+        """
+        offsets = set(rule.offsets)
+        if any((-dr, -dc) not in offsets for dr, dc in offsets):
+            raise ValueError(f"Move rule must be symmetric: {rule}")
+        self.r = r
+        self.rule = rule
+        self.reach = max([abs(dc) for _, dc in offsets] + [0])
+        self.slots = (self.reach + 1) * r
+        # moves to cells swept earlier: previous columns, or earlier rows of the same column
+        self.backward = sorted((dr, dc) for dr, dc in offsets if dc < 0 or (dc == 0 and dr < 0))
+        # cells leaving the frontier once each row of the newest column is swept, as (row, column offset)
+        self.leaving: List[List[Tuple[int, int]]] = [[] for _ in range(r)]
+        for row in range(r):
+            forward = [(dc, row + dr) for dr, dc in offsets
+                       if (dc > 0 or (dc == 0 and dr > 0)) and 0 <= row + dr < r]
+            last_dc, last_row = max(forward) if forward else (0, row)
+            self.leaving[last_row].append((row, self.reach - last_dc))
+        # swept cells left with a single move once each row of the newest column is swept: if still untouched,
+        # they can only be endpoints of the path
+        self.last_move: List[List[int]] = [[] for _ in range(r)]
+        for step_row in range(r):
+            for row in range(r):
+                for column in range(self.reach + 1):
+                    if column == self.reach and row > step_row:
+                        continue
+                    moves = sum(1 for dr, dc in offsets if 0 <= row + dr < r and (
+                        column + dc > self.reach or (column + dc == self.reach and row + dr > step_row)
+                    ))
+                    if moves == 1:
+                        self.last_move[step_row].append(self._slot(row, column))
+        # for each row, the transitions of every state swept so far
+        self._transitions: List[Dict[State, Tuple[State, ...]]] = [{} for _ in range(r)]
+
+    def _slot(self, row: int, column: int) -> int:
+        """
+            Get the index in the frontier of a cell, by row and column offset (0 for the oldest column).
+        """
+        return column * self.r + row
+
+    @staticmethod
+    def _pack(labels: List[int], ends: int, closed: bool) -> State:
+        """
+            Pack a state, relabelling the fragments in order of first appearance so that equivalent states are equal.
+        """
+        mapping: Dict[int, int] = {}
+        packed = [mapping.setdefault(label, len(mapping) + FRAGMENT) if label >= FRAGMENT else label for label in labels]
+        packed.append(ends)
+        packed.append(closed)
+        return bytes(packed)
+
+    def _add_cell(self, labels: List[int], row: int) -> List[Tuple[List[int], bool]]:
+        """
+            Add the cell of the given row in the newest column, choosing which of its moves to earlier cells
+            belong to the path.
+
+            :return: The resulting labels, each with whether it completed the path.
+        """
+        cell = self._slot(row, self.reach)
+        neighbors = []
+        for dr, dc in self.backward:
+            if 0 <= row + dr < self.r:
+                slot = self._slot(row + dr, self.reach + dc)
+                if labels[slot] != SATURATED:
+                    neighbors.append(slot)
+
+        fresh = max(max(labels) + 1, FRAGMENT)
+        # no move: the cell stays untouched
+        results: List[Tuple[List[int], bool]] = [(list(labels), False)]
+
+        # one move: start a fragment with an untouched cell, or extend a fragment
+        for u in neighbors:
+            new = list(labels)
+            if labels[u] == UNTOUCHED:
+                new[u] = new[cell] = fresh
+            else:
+                new[u] = SATURATED
+                new[cell] = labels[u]
+            results.append((new, False))
+
+        # two moves: the cell becomes internal, joining two fragments
+        for a in range(len(neighbors)):
+            for b in range(a + 1, len(neighbors)):
+                u, w = neighbors[a], neighbors[b]
+                new = list(labels)
+                new[cell] = SATURATED
+                if labels[u] == UNTOUCHED and labels[w] == UNTOUCHED:
+                    new[u] = new[w] = fresh
+                elif labels[u] == UNTOUCHED or labels[w] == UNTOUCHED:
+                    untouched, end = (u, w) if labels[u] == UNTOUCHED else (w, u)
+                    new[untouched] = labels[end]
+                    new[end] = SATURATED
+                elif labels[u] == labels[w]:
+                    continue    # both ends of one fragment: it would close a cycle
+                else:
+                    new[u] = new[w] = SATURATED
+                    new = [label if label != labels[w] else labels[u] for label in new]
+                    if labels[u] not in new:
+                        # both other ends were endpoints of the path: it is complete
+                        results.append((new, True))
+                        continue
+                results.append((new, False))
+        return results
+
+    def _step(self, state: State, row: int) -> Tuple[State, ...]:
+        """
+            Sweep the cell of the given row in the newest column, then drop the cells no future move reaches.
+
+            :return: The resulting states, one per choice of moves (repeated states count separately).
+        """
+        transitions = self._transitions[row]
+        cached = transitions.get(state)
+        if cached is not None:
+            return cached
+        labels, ends, closed = list(state[:-2]), state[-2], state[-1]
+        results: List[State] = []
+        if not closed:
+            for new, complete in self._add_cell(labels, row):
+                new_ends = ends
+                # a complete path must cover everything
+                valid = not complete or all(label == SATURATED for label in new)
+                for leaving_row, column in self.leaving[row]:
+                    if not valid:
+                        break
+                    slot = self._slot(leaving_row, column)
+                    label = new[slot]
+                    new[slot] = SATURATED
+                    if label == UNTOUCHED:
+                        valid = False
+                    elif label >= FRAGMENT:
+                        # a fragment end nothing can reach anymore is an endpoint of the path
+                        new_ends += 1
+                        if new_ends > 2:
+                            valid = False
+                        elif label not in new:
+                            # both endpoints are fixed: the path is complete, and must cover everything
+                            complete = all(other == SATURATED for other in new)
+                            valid = complete
+                if valid and not complete:
+                    valid = new_ends + sum(1 for slot in self.last_move[row] if new[slot] == UNTOUCHED) <= 2
+                if valid:
+                    results.append(self._pack(new, new_ends, complete))
+        transitions[state] = cached = tuple(results)
+        return cached
+
+    @staticmethod
+    def _is_complete(state: State) -> bool:
+        """
+            Check whether a state is a single Hamiltonian path once the board ends.
+        """
+        labels, ends, closed = state[:-2], state[-2], state[-1]
+        if closed:
+            return True
+        if UNTOUCHED in labels:
+            return False
+        fragments = {label for label in labels if label >= FRAGMENT}
+        if len(fragments) != 1:
+            return False
+        return labels.count(fragments.pop()) + ends == 2
+
+    def count(self, max_c: int) -> List[int]:
+        """
+            Count the Hamiltonian paths of the r x c boards, for every c from 1 to max_c.
+            As in `Solver.solve`, each path is counted once per direction.
+
+            :param max_c: The largest number of columns.
+            :return: The counts, the i-th for i + 1 columns.
+        """
+        counts: List[int] = []
+        states: Dict[State, int] = {self._pack([SATURATED] * self.slots, 0, False): 1}
+        fresh = [UNTOUCHED] * self.r
+        for c in range(1, max_c + 1):
+            # the oldest column has left the frontier: make room for the new one
+            shifted: Dict[State, int] = {}
+            for state, count in states.items():
+                if state[-1]:
+                    continue
+                state = self._pack(list(state[self.r:-2]) + fresh, state[-2], False)
+                shifted[state] = shifted.get(state, 0) + count
+            states = shifted
+
+            for row in range(self.r):
+                next_states: Dict[State, int] = {}
+                for state, count in states.items():
+                    for new in self._step(state, row):
+                        next_states[new] = next_states.get(new, 0) + count
+                states = next_states
+
+            paths = sum(count for state, count in states.items() if self._is_complete(state))
+            counts.append(2 * paths if self.r * c > 1 else 0)
+        return counts
+
+import unittest
+
+class TestTransferMatrixCounter(unittest.TestCase):
+    def _brute_force(self, r: int, c: int, rule: MoveRule = DIPLOMATICO) -> int:
+        neighbors = rule.compile(r, c).neighbors
+        size = r * c
+        full = (1 << size) - 1
+
+        def extend(cell: int, visited: int) -> int:
+            if visited == full:
+                return 1
+            return sum(extend(j, visited | (1 << j)) for j in neighbors[cell] if not visited & (1 << j))
+
+        return sum(extend(i, 1 << i) for i in range(size)) if size > 1 else 0
+
+    def test_matches_brute_force(self):
+        for r, max_c in [(1, 5), (2, 6), (3, 6), (4, 5)]:
+            counts = TransferMatrixCounter(r).count(max_c)
+            self.assertEqual(counts, [self._brute_force(r, c) for c in range(1, max_c + 1)], f"r = {r}")
+
+    def test_matches_solver(self):
+        from src.diplomatico.board import Board
+        from src.solver import Solver
+        self.assertEqual(TransferMatrixCounter(4).count(5)[-1], len(Solver(Board(4, 5)).solve()))
+
+    def test_knight(self):
+        from src.diplomatico.moves import KNIGHT
+        counts = TransferMatrixCounter(3, rule=KNIGHT).count(5)
+        self.assertEqual(counts, [self._brute_force(3, c, KNIGHT) for c in range(1, 6)])
+
+    def test_asymmetric_rule(self):
+        with self.assertRaises(ValueError):
+            TransferMatrixCounter(3, rule=MoveRule([(0, 1)]))
+
+if __name__ == "__main__":
+    unittest.main()
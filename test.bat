@@ -10,7 +10,7 @@ REM call conda activate diplomatico
 
 setlocal enabledelayedexpansion
 set SIZES="4,5" "4,6" "4,7" "5,5"
-set QTYPES=CONSTRUCTIVE APOC PYTHON
+set QTYPES=CONSTRUCTIVE INCREMENTAL APOC PYTHON
 
 echo Phase A: runs with --n 1 >> %OUTPUT%
 for %%S in (%SIZES%) do (
@@ -40,6 +40,26 @@ for %%S in (%SIZES%) do (
 	)
 )
 
+echo Phase C: Hamiltonian cycle counts per board size >> %OUTPUT%
+for %%S in (%SIZES%) do (
+	for /f "tokens=1,2 delims=," %%A in ("%%~S") do (
+		echo Parameters: --r %%A --c %%B --query_type PYTHON --cycles >> %OUTPUT%
+		python main.py --r %%A --c %%B --query_type PYTHON --cycles >> %OUTPUT% 2>&1
+		echo. >> %OUTPUT%
+	)
+)
+
+echo Phase D: path counts with k levels expanded breadth-first >> %OUTPUT%
+for %%S in (%SIZES%) do (
+	for %%K in (0 4 8 12) do (
+		for /f "tokens=1,2 delims=," %%A in ("%%~S") do (
+			echo Parameters: --r %%A --c %%B --query_type PYTHON --count --k %%K --t 3 >> %OUTPUT%
+			python main.py --r %%A --c %%B --query_type PYTHON --count --k %%K --t 3 >> %OUTPUT% 2>&1
+			echo. >> %OUTPUT%
+		)
+	)
+)
+
 echo Test run finished at %DATE% %TIME% >> %OUTPUT%
 echo ======================================= >> %OUTPUT%
 echo Results saved to %OUTPUT%